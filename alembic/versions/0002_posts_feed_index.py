@@ -0,0 +1,30 @@
+"""keyset index for blog post feeds"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0002_posts_feed_index"
+down_revision = "0001_initial"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_posts_blog_feed",
+        "posts",
+        [
+            "blog_id",
+            "status",
+            sa.text("published_at DESC NULLS LAST"),
+            sa.text("created_at DESC"),
+            sa.text("id DESC"),
+        ],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_posts_blog_feed", table_name="posts")
@@ -0,0 +1,61 @@
+"""daily like rollup for trending queries"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+import sqlalchemy.dialects.postgresql as pg
+from alembic import op
+
+revision = "0003_post_like_daily"
+down_revision = "0002_posts_feed_index"
+branch_labels = None
+depends_on = None
+
+post_category_enum = pg.ENUM(
+    "free",
+    "dev",
+    "celeb",
+    "love",
+    "work",
+    "book",
+    "health",
+    name="post_category",
+    create_type=False,
+)
+
+
+def upgrade() -> None:
+    op.create_index(op.f("ix_post_likes_created_at"), "post_likes", ["created_at"], unique=False)
+
+    op.create_table(
+        "post_like_daily",
+        sa.Column("post_id", sa.Integer(), sa.ForeignKey("posts.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("blog_id", sa.Integer(), sa.ForeignKey("blogs.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("category", post_category_enum, nullable=False),
+        sa.Column("likes", sa.Integer(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("post_id", "day", name="pk_post_like_daily"),
+    )
+    op.create_index(op.f("ix_post_like_daily_day"), "post_like_daily", ["day"], unique=False)
+    op.create_index(op.f("ix_post_like_daily_blog_id"), "post_like_daily", ["blog_id"], unique=False)
+
+    op.execute(
+        """
+        INSERT INTO post_like_daily (post_id, day, blog_id, category, likes)
+        SELECT post_likes.post_id,
+               (post_likes.created_at AT TIME ZONE 'UTC')::date,
+               posts.blog_id,
+               posts.category,
+               count(*)
+        FROM post_likes
+        JOIN posts ON posts.id = post_likes.post_id
+        GROUP BY post_likes.post_id, (post_likes.created_at AT TIME ZONE 'UTC')::date, posts.blog_id, posts.category
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_post_like_daily_blog_id"), table_name="post_like_daily")
+    op.drop_index(op.f("ix_post_like_daily_day"), table_name="post_like_daily")
+    op.drop_table("post_like_daily")
+    op.drop_index(op.f("ix_post_likes_created_at"), table_name="post_likes")
@@ -0,0 +1,45 @@
+"""indexes for expiring auth codes and refresh tokens"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0004_token_reaper_indexes"
+down_revision = "0003_post_like_daily"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_auth_codes_expires_at", "auth_codes", ["expires_at"], unique=False)
+    op.create_index(
+        "ix_auth_codes_live_email",
+        "auth_codes",
+        ["email"],
+        unique=False,
+        postgresql_where=sa.text("NOT consumed"),
+    )
+    op.create_index("ix_refresh_tokens_expires_at", "refresh_tokens", ["expires_at"], unique=False)
+    op.create_index(
+        "ix_refresh_tokens_live_user_id",
+        "refresh_tokens",
+        ["user_id"],
+        unique=False,
+        postgresql_where=sa.text("NOT revoked"),
+    )
+    op.create_index(
+        "ix_refresh_tokens_rotated_from_id",
+        "refresh_tokens",
+        ["rotated_from_id"],
+        unique=False,
+        postgresql_where=sa.text("rotated_from_id IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_refresh_tokens_rotated_from_id", table_name="refresh_tokens")
+    op.drop_index("ix_refresh_tokens_live_user_id", table_name="refresh_tokens")
+    op.drop_index("ix_refresh_tokens_expires_at", table_name="refresh_tokens")
+    op.drop_index("ix_auth_codes_live_email", table_name="auth_codes")
+    op.drop_index("ix_auth_codes_expires_at", table_name="auth_codes")
@@ -0,0 +1,23 @@
+"""composite index for paginated comment threads"""
+
+from __future__ import annotations
+
+from alembic import op
+
+revision = "0005_comment_thread_index"
+down_revision = "0004_token_reaper_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_comments_post_parent_created",
+        "comments",
+        ["post_id", "parent_id", "created_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_comments_post_parent_created", table_name="comments")
@@ -0,0 +1,27 @@
+"""applied counter flush batches"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0006_counter_flushes"
+down_revision = "0005_comment_thread_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "counter_flushes",
+        sa.Column("batch_id", sa.String(length=32), nullable=False),
+        sa.Column("field", sa.String(length=32), nullable=False),
+        sa.Column("applied_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("batch_id", name="pk_counter_flushes"),
+    )
+    op.create_index(op.f("ix_counter_flushes_applied_at"), "counter_flushes", ["applied_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_counter_flushes_applied_at"), table_name="counter_flushes")
+    op.drop_table("counter_flushes")
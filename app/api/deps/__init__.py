@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from typing import Annotated, AsyncIterator
+from collections.abc import Awaitable, Callable
+from typing import Annotated, Any, AsyncIterator
 
 from fastapi import Cookie, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -9,6 +10,9 @@ from app.core.config import settings
 from app.core.security import decode_token
 from app.db.base import SessionLocal
 from app.db.models.user import User
+from app.schemas.auth import Principal
+from app.services import user_cache
+from app.utils.rate_limit import RateLimitRule, enforce_rate_limits
 
 
 async def get_db_session() -> AsyncIterator[AsyncSession]:
@@ -16,19 +20,16 @@ async def get_db_session() -> AsyncIterator[AsyncSession]:
         yield session
 
 
-async def get_current_user(
-        request: Request,
-        session: Annotated[AsyncSession, Depends(get_db_session)],
-        access_token: str | None = Cookie(default=None, alias="access_token"),
-) -> User:
-    token = access_token
-    if token is None:
-        auth_header = request.headers.get("Authorization")
-        if auth_header and auth_header.startswith("Bearer "):
-            token = auth_header.removeprefix("Bearer ")
-    if token is None:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+def _extract_access_token(request: Request, access_token: str | None) -> str | None:
+    if access_token is not None:
+        return access_token
+    auth_header = request.headers.get("Authorization")
+    if auth_header and auth_header.startswith("Bearer "):
+        return auth_header.removeprefix("Bearer ")
+    return None
 
+
+def _verify_access_token(token: str) -> dict[str, Any]:
     try:
         payload = decode_token(token)
     except Exception:  # noqa: BLE001
@@ -37,11 +38,22 @@ async def get_current_user(
     if payload.get("typ") == "refresh":
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token type")
 
-    user_id = payload.get("sub")
-    if not user_id:
+    if not payload.get("sub"):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    return payload
+
 
-    user = await session.get(User, user_id)
+async def get_current_user(
+        request: Request,
+        session: Annotated[AsyncSession, Depends(get_db_session)],
+        access_token: str | None = Cookie(default=None, alias="access_token"),
+) -> User:
+    token = _extract_access_token(request, access_token)
+    if token is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+
+    payload = _verify_access_token(token)
+    user = await user_cache.get_user(session, payload["sub"])
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
 
@@ -61,6 +73,8 @@ async def get_current_user_optional(
         session: Annotated[AsyncSession, Depends(get_db_session)],
         access_token: str | None = Cookie(default=None, alias="access_token"),
 ) -> User | None:
+    if _extract_access_token(request, access_token) is None:
+        return None
     try:
         return await get_current_user(request, session, access_token)
     except HTTPException as exc:
@@ -69,21 +83,56 @@ async def get_current_user_optional(
         raise
 
 
-async def set_auth_cookies(response: Response, access_token: str, refresh_token: str) -> None:
-    cookie_domain = settings.security.cookie_domain
-    cookie_domain = cookie_domain if cookie_domain else None
-    secure = settings.security.secure_cookies
-    same_site = settings.security.same_site
+async def get_principal_optional(
+        request: Request,
+        access_token: str | None = Cookie(default=None, alias="access_token"),
+) -> Principal | None:
+    token = _extract_access_token(request, access_token)
+    if token is None:
+        return None
+    try:
+        payload = _verify_access_token(token)
+    except HTTPException:
+        return None
+    return Principal(id=payload["sub"], onboarding_completed=bool(payload.get("onboarded", False)))
+
+
+def rate_limit(scope: str, limit: int, window_seconds: int = 60) -> Callable[..., Awaitable[None]]:
+    # Authenticated callers are limited per user, anonymous ones per client address.
+    async def dependency(
+            request: Request,
+            response: Response,
+            principal: Annotated[Principal | None, Depends(get_principal_optional)],
+    ) -> None:
+        if principal is not None:
+            subject = f"user:{principal.id}"
+        else:
+            subject = f"ip:{request.client.host if request.client else 'unknown'}"
+        result = await enforce_rate_limits(RateLimitRule(f"{scope}:{subject}", limit, window_seconds))
+        response.headers.update(result.headers())
+
+    return dependency
+
+
+def set_access_cookie(response: Response, access_token: str) -> None:
     response.set_cookie(
         "access_token",
         access_token,
         max_age=settings.jwt.access_token_ttl_minutes * 60,
         httponly=True,
-        secure=secure,
-        samesite=same_site,
-        domain=cookie_domain,
+        secure=settings.security.secure_cookies,
+        samesite=settings.security.same_site,
+        domain=settings.security.cookie_domain or None,
         path="/",
     )
+
+
+async def set_auth_cookies(response: Response, access_token: str, refresh_token: str) -> None:
+    cookie_domain = settings.security.cookie_domain
+    cookie_domain = cookie_domain if cookie_domain else None
+    secure = settings.security.secure_cookies
+    same_site = settings.security.same_site
+    set_access_cookie(response, access_token)
     response.set_cookie(
         "refresh_token",
         refresh_token,
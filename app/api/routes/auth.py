@@ -5,7 +5,6 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_db_session, set_auth_cookies
 from app.core.security import decode_token, hash_token
-from app.db.models.user import User
 from app.schemas.auth import AuthResponse, OTPRequest, OTPVerify
 from app.schemas.user import UserPublic
 from app.services import auth as auth_service
@@ -49,19 +48,12 @@ async def refresh_token_endpoint(
     if payload.get("typ") != "refresh":
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token type")
 
-    token_hash_value = hash_token(refresh_token)
-    token_model = await auth_service.get_refresh_token(session, token_hash_value)
-    if not token_model:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token revoked")
+    user, access_token, new_refresh_token = await auth_service.rotate_refresh_token(
+        session, hash_token(refresh_token), payload["sub"]
+    )
 
-    access_token, new_refresh_token, _ = await auth_service.rotate_refresh_token(session, token_model)
-    await session.commit()
+    await set_auth_cookies(response, access_token, new_refresh_token)
 
-    set_auth_cookies(response, access_token, new_refresh_token)
-
-    user = await session.get(User, token_model.user_id)
-    if not user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     onboarding_required = not user.onboarding_completed
     return AuthResponse(user=UserPublic.model_validate(user), onboarding_required=onboarding_required)
 
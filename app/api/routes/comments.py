@@ -1,20 +1,31 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from pydantic import TypeAdapter
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.api.deps import ensure_onboarded, get_db_session
+from app.api.deps import ensure_onboarded, get_db_session, rate_limit
+from app.core.config import settings
 from app.db.models.blog import Blog
 from app.db.models.comment import Comment
 from app.db.models.post import Post
 from app.db.models.user import User
-from app.schemas.comment import CommentCreate, CommentPublic
+from app.schemas.comment import CommentCreate, CommentPublic, CommentThread
+from app.schemas.common import CursorPaginatedResponse
+from app.services import comment_cache
 from app.services import comments as comment_service
 
 router = APIRouter()
 
+DEFAULT_PAGE_SIZE = 20
+DEFAULT_REPLY_LIMIT = 3
+
+_flat_comments_adapter = TypeAdapter(list[CommentPublic])
+
 
 async def _get_post(session: AsyncSession, post_id: int) -> Post:
     stmt = (
@@ -29,16 +40,117 @@ async def _get_post(session: AsyncSession, post_id: int) -> Post:
     return post
 
 
-@router.get("/{post_id}/comments", response_model=list[CommentPublic])
+@router.get(
+    "/{post_id}/comments",
+    response_model=list[CommentPublic] | CursorPaginatedResponse[CommentThread],
+)
 async def list_comments_endpoint(
         post_id: int,
+        view: Literal["flat", "tree"] = Query("flat"),
+        cursor: str | None = Query(None),
+        size: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=100),
+        reply_limit: int = Query(DEFAULT_REPLY_LIMIT, ge=0, le=20),
+        reply_depth: int = Query(2, ge=0, le=5),
         session: AsyncSession = Depends(get_db_session),
-) -> list[CommentPublic]:
-    post = await _get_post(session, post_id)
-    return await comment_service.list_comments(session, post)
+) -> Response:
+    flat = view == "flat" and cursor is None
+
+    async def build() -> comment_cache.Page:
+        post = await _get_post(session, post_id)
+        if flat:
+            comments = await comment_service.list_comments(session, post)
+            return comment_cache.Page(_flat_comments_adapter.dump_json(comments))
+        page = await _comment_thread_page(
+            session, post, None, cursor=cursor, size=size, reply_limit=reply_limit, reply_depth=reply_depth
+        )
+        return _cache_page(page)
+
+    if flat:
+        payload = await comment_cache.get_page(post_id, comment_cache.page_field("flat"), build)
+    else:
+        payload = await comment_cache.get_page(
+            post_id,
+            comment_cache.page_field("tree", cursor, size, reply_limit, reply_depth),
+            build,
+            cursor=cursor,
+            cacheable=size == DEFAULT_PAGE_SIZE and reply_limit == DEFAULT_REPLY_LIMIT and reply_depth == 2,
+        )
+    return Response(content=payload, media_type="application/json")
+
+
+@router.get("/{post_id}/comments/{comment_id}/replies", response_model=CursorPaginatedResponse[CommentThread])
+async def list_comment_replies_endpoint(
+        post_id: int,
+        comment_id: int,
+        cursor: str | None = Query(None),
+        size: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=100),
+        reply_limit: int = Query(DEFAULT_REPLY_LIMIT, ge=0, le=20),
+        reply_depth: int = Query(1, ge=0, le=5),
+        session: AsyncSession = Depends(get_db_session),
+) -> Response:
+    async def build() -> comment_cache.Page:
+        post = await _get_post(session, post_id)
+        parent = await session.get(Comment, comment_id)
+        if not parent or parent.post_id != post.id:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Comment not found")
+        page = await _comment_thread_page(
+            session, post, comment_id, cursor=cursor, size=size, reply_limit=reply_limit, reply_depth=reply_depth
+        )
+        return _cache_page(page)
+
+    payload = await comment_cache.get_page(
+        post_id,
+        comment_cache.page_field("replies", comment_id, cursor, size, reply_limit, reply_depth),
+        build,
+        cursor=cursor,
+        cacheable=size == DEFAULT_PAGE_SIZE and reply_limit == DEFAULT_REPLY_LIMIT and reply_depth == 1,
+    )
+    return Response(content=payload, media_type="application/json")
+
+
+def _cache_page(page: CursorPaginatedResponse[CommentThread]) -> comment_cache.Page:
+    # Every cursor in the page may come back as a request, so each one is registered as cacheable.
+    cursors = [page.next_cursor] if page.next_cursor else []
+    pending = list(page.items)
+    while pending:
+        node = pending.pop()
+        if node.replies_cursor:
+            cursors.append(node.replies_cursor)
+        pending.extend(node.replies)
+    return comment_cache.Page(page.model_dump_json().encode("utf-8"), tuple(cursors))
+
+
+async def _comment_thread_page(
+        session: AsyncSession,
+        post: Post,
+        parent_id: int | None,
+        *,
+        cursor: str | None,
+        size: int,
+        reply_limit: int,
+        reply_depth: int,
+) -> CursorPaginatedResponse[CommentThread]:
+    try:
+        threads, next_cursor = await comment_service.list_comment_threads(
+            session,
+            post,
+            parent_id=parent_id,
+            size=size,
+            cursor=cursor,
+            reply_limit=reply_limit,
+            reply_depth=reply_depth,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    return CursorPaginatedResponse[CommentThread](items=threads, next_cursor=next_cursor, size=size)
 
 
-@router.post("/{post_id}/comments", response_model=CommentPublic, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/{post_id}/comments",
+    response_model=CommentPublic,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(rate_limit("comments", settings.rate_limits.comments_per_minute))],
+)
 async def add_comment_endpoint(
         post_id: int,
         payload: CommentCreate,
@@ -3,7 +3,8 @@ from __future__ import annotations
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import ensure_onboarded, get_db_session
+from app.api.deps import ensure_onboarded, get_db_session, rate_limit
+from app.core.config import settings
 from app.db.models.post import Post
 from app.db.models.user import User
 from app.services import likes as like_service
@@ -18,7 +19,10 @@ async def _get_post(session: AsyncSession, post_id: int) -> Post:
     return post
 
 
-@router.post("/{post_id}/likes/toggle")
+@router.post(
+    "/{post_id}/likes/toggle",
+    dependencies=[Depends(rate_limit("likes", settings.rate_limits.likes_per_minute))],
+)
 async def toggle_like_endpoint(
         post_id: int,
         user: User = Depends(ensure_onboarded),
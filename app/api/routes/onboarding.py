@@ -2,13 +2,14 @@
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_current_user, get_db_session
+from app.api.deps import get_current_user, get_db_session, set_access_cookie
 from app.db.models.user import User
 from app.schemas.user import AvailabilityResponse, MeResponse, OnboardingPayload
 from app.services import users as user_service
+from app.services.auth import issue_access_token
 
 router = APIRouter()
 
@@ -25,6 +26,7 @@ async def get_me(
 @router.post("/onboard", response_model=MeResponse)
 async def complete_onboarding_endpoint(
         payload: OnboardingPayload,
+        response: Response,
         user: User = Depends(get_current_user),
         session: AsyncSession = Depends(get_db_session),
 ) -> MeResponse:
@@ -33,6 +35,8 @@ async def complete_onboarding_endpoint(
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
 
+    set_access_cookie(response, issue_access_token(updated_user.id, updated_user.onboarding_completed))
+
     return await user_service.serialize_me(updated_user)
 
 @router.get("/availability/nickname", response_model=AvailabilityResponse)
@@ -1,19 +1,26 @@
 from __future__ import annotations
 
+from typing import Literal
+
 from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import ensure_onboarded, get_current_user_optional, get_db_session
+from app.api.deps import ensure_onboarded, get_db_session, get_principal_optional
+from app.core.config import settings
 from app.core.security import get_client_fingerprint
 from app.db.models.blog import Blog
 from app.db.models.enums import PostCategory, PostStatus
 from app.db.models.post import Post
 from app.db.models.user import User
-from app.schemas.common import PaginatedResponse
-from app.schemas.post import PostCreate, PostDetail, PostSummary, PostUpdate
+from app.schemas.auth import Principal
+from app.schemas.common import CursorPaginatedResponse, PaginatedResponse
+from app.schemas.post import PostCreate, PostDetail, PostSummary, PostUpdate, PostViewStats
 from app.services import blogs as blog_service
+from app.services import counters as counter_service
+from app.services import likes as like_service
+from app.services import post_cache
 from app.services import posts as post_service
-from app.services.auth import record_post_view
+from app.services.auth import count_unique_post_viewers, record_post_view
 
 router = APIRouter()
 
@@ -25,28 +32,73 @@ async def _get_blog_or_404(session: AsyncSession, slug: str) -> Blog:
     return blog
 
 
-async def _get_post_or_404(session: AsyncSession, blog: Blog, slug: str, include_unpublished: bool = False) -> Post:
-    post = await post_service.get_post_by_slug(session, blog, slug, include_unpublished=include_unpublished)
+async def _get_post_or_404(
+        session: AsyncSession,
+        blog: Blog,
+        slug: str,
+        include_unpublished: bool = False,
+        include_content: bool = True,
+) -> Post:
+    post = await post_service.get_post_by_slug(
+        session, blog, slug, include_unpublished=include_unpublished, include_content=include_content
+    )
     if not post:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found")
     return post
 
 
-@router.get("/{slug}/posts", response_model=PaginatedResponse[PostSummary])
+@router.get(
+    "/{slug}/posts",
+    response_model=PaginatedResponse[PostSummary] | CursorPaginatedResponse[PostSummary],
+)
 async def list_posts_endpoint(
         slug: str,
+        response: Response,
         page: int = Query(1, ge=1),
         size: int = Query(10, ge=1, le=100),
+        pagination: Literal["page", "cursor"] = Query("page"),
+        cursor: str | None = Query(None),
+        include_total: bool = Query(False),
         tag: str | None = Query(None),
         category: PostCategory | None = Query(None),
         status_filter: PostStatus | None = Query(None),
         session: AsyncSession = Depends(get_db_session),
-        current_user: User | None = Depends(get_current_user_optional),
-) -> PaginatedResponse[PostSummary]:
+        principal: Principal | None = Depends(get_principal_optional),
+) -> PaginatedResponse[PostSummary] | CursorPaginatedResponse[PostSummary]:
+    response.headers["Vary"] = "Authorization, Cookie"
     blog = await _get_blog_or_404(session, slug)
-    is_owner = current_user and current_user.id == blog.user_id
-    effective_status = status_filter if is_owner else PostStatus.PUBLISHED
+    is_owner = principal is not None and principal.id == blog.user_id
+    effective_status = status_filter if is_owner else PostStatus.published
     normalized_tag = tag.lower() if tag else None
+
+    if pagination == "cursor" or cursor:
+        try:
+            posts, next_cursor = await post_service.list_posts_by_cursor(
+                session,
+                blog=blog,
+                size=size,
+                cursor=cursor,
+                tag_slug=normalized_tag,
+                category=category,
+                status_filter=effective_status,
+            )
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+        total = None
+        if include_total:
+            total = await post_service.count_posts(
+                session,
+                blog=blog,
+                tag_slug=normalized_tag,
+                category=category,
+                status_filter=effective_status,
+            )
+        if principal is not None:
+            await like_service.mark_liked_by_me(session, principal.id, posts)
+        return CursorPaginatedResponse[PostSummary](
+            items=posts, next_cursor=next_cursor, size=size, total=total
+        )
+
     posts, total = await post_service.list_posts(
         session,
         blog=blog,
@@ -56,6 +108,8 @@ async def list_posts_endpoint(
         category=category,
         status_filter=effective_status,
     )
+    if principal is not None:
+        await like_service.mark_liked_by_me(session, principal.id, posts)
     return PaginatedResponse[PostSummary](items=posts, total=total, page=page, size=size)
 
 
@@ -65,19 +119,72 @@ async def get_post_endpoint(
         post_slug: str,
         request: Request,
         session: AsyncSession = Depends(get_db_session),
-        current_user: User | None = Depends(get_current_user_optional),
-) -> PostDetail:
+        principal: Principal | None = Depends(get_principal_optional),
+) -> Response:
     blog = await _get_blog_or_404(session, slug)
-    include_unpublished = current_user is not None and current_user.id == blog.user_id
-    post = await _get_post_or_404(session, blog, post_slug, include_unpublished=include_unpublished)
+    include_unpublished = principal is not None and principal.id == blog.user_id
+    post = await _get_post_or_404(
+        session, blog, post_slug, include_unpublished=include_unpublished, include_content=False
+    )
 
-    fingerprint = current_user.id if current_user else get_client_fingerprint(request)
+    fingerprint = principal.id if principal else get_client_fingerprint(request)
     if await record_post_view(post.id, fingerprint):
-        post.view_count += 1
-        await session.commit()
-        await session.refresh(post)
+        await counter_service.increment_pending("view_count", post.id)
+    pending = await counter_service.get_pending_counts(post.id)
+
+    rendered = await post_cache.get_rendered(post)
+    if rendered is None:
+        post = await post_service.load_post_detail(session, post.id)
+        rendered = await post_cache.store_rendered(post, post_service.serialize_post_detail(post))
+    static_body, digest = rendered
+
+    liked_by_me = None
+    if principal is not None:
+        liked_by_me = post.id in await like_service.liked_post_ids(session, principal.id, [post.id])
+    dynamic = {
+        "like_count": max(0, post.like_count + pending["like_count"]),
+        "comment_count": max(0, post.comment_count + pending["comment_count"]),
+        "view_count": post.view_count + pending["view_count"],
+        "liked_by_me": liked_by_me,
+    }
+    etag = post_cache.compute_etag(digest, **dynamic)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "no-cache" if post.status == PostStatus.published else "private, no-cache",
+        "Vary": "Authorization, Cookie",
+    }
+    if post_cache.etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(
+        content=post_cache.compose_body(static_body, **dynamic),
+        media_type="application/json",
+        headers=headers,
+    )
 
-    return post_service.serialize_post_detail(post)
+
+@router.get("/{slug}/posts/{post_slug}/stats", response_model=PostViewStats)
+async def get_post_stats_endpoint(
+        slug: str,
+        post_slug: str,
+        hours: int = Query(24, ge=1, le=720),
+        session: AsyncSession = Depends(get_db_session),
+        principal: Principal | None = Depends(get_principal_optional),
+) -> PostViewStats:
+    blog = await _get_blog_or_404(session, slug)
+    include_unpublished = principal is not None and principal.id == blog.user_id
+    post = await _get_post_or_404(
+        session, blog, post_slug, include_unpublished=include_unpublished, include_content=False
+    )
+
+    window_hours = min(hours, settings.post_view_hll_retention_hours)
+    pending_views = await counter_service.get_pending("view_count", post.id)
+    unique_viewers = await count_unique_post_viewers(post.id, window_hours)
+    return PostViewStats(
+        post_id=post.id,
+        view_count=post.view_count + pending_views,
+        unique_viewers=unique_viewers,
+        window_hours=window_hours,
+    )
 
 
 @router.post("/{slug}/posts", response_model=PostDetail, status_code=status.HTTP_201_CREATED)
@@ -1,37 +1,97 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Depends, Query, Response
+from pydantic import TypeAdapter
 
-from app.api.deps import get_db_session
+from app.api.deps import get_principal_optional
+from app.core.config import settings
+from app.db.base import get_session
+from app.schemas.auth import Principal
 from app.schemas.trending import CategoryTrending, TrendingPost, TrendingUser
+from app.services import likes as like_service
 from app.services import trending as trending_service
+from app.utils.snapshot import SnapshotBuilder, get_snapshot
 
 router = APIRouter()
 
+_trending_posts_adapter = TypeAdapter(list[TrendingPost])
+_category_trending_adapter = TypeAdapter(list[CategoryTrending])
+_trending_users_adapter = TypeAdapter(list[TrendingUser])
+
+
+async def _load_snapshot(key: str, build: SnapshotBuilder) -> bytes | str:
+    return await get_snapshot(
+        key,
+        build,
+        fresh_seconds=settings.trending_snapshot_fresh_seconds,
+        stale_seconds=settings.trending_snapshot_stale_seconds,
+    )
+
+
+def _viewer_response(content: bytes | str) -> Response:
+    # Signed-in viewers get their like state merged in, so shared caches must key on credentials.
+    return Response(
+        content=content, media_type="application/json", headers={"Vary": "Authorization, Cookie"}
+    )
+
+
+async def _snapshot_response(key: str, build: SnapshotBuilder) -> Response:
+    return Response(content=await _load_snapshot(key, build), media_type="application/json")
+
 
 @router.get("/posts", response_model=list[TrendingPost])
 async def trending_posts_endpoint(
         period_days: int = Query(30, ge=1, le=365),
         limit: int = Query(10, ge=1, le=50),
-        session: AsyncSession = Depends(get_db_session),
-) -> list[TrendingPost]:
-    return await trending_service.trending_posts(session, period_days=period_days, limit=limit)
+        principal: Principal | None = Depends(get_principal_optional),
+) -> Response:
+    async def build() -> bytes:
+        async with get_session() as session:
+            posts = await trending_service.trending_posts(session, period_days=period_days, limit=limit)
+        return _trending_posts_adapter.dump_json(posts)
+
+    payload = await _load_snapshot(f"trending:posts:{period_days}:{limit}", build)
+    if principal is None:
+        return _viewer_response(payload)
+
+    # The shared snapshot is anonymous; signed-in viewers get their like state layered on top.
+    trending = _trending_posts_adapter.validate_json(payload)
+    async with get_session() as session:
+        await like_service.mark_liked_by_me(session, principal.id, [item.post for item in trending])
+    return _viewer_response(_trending_posts_adapter.dump_json(trending))
 
 
 @router.get("/by-category", response_model=list[CategoryTrending])
 async def trending_by_category_endpoint(
         period_days: int = Query(30, ge=1, le=365),
         limit: int = Query(5, ge=1, le=20),
-        session: AsyncSession = Depends(get_db_session),
-) -> list[CategoryTrending]:
-    return await trending_service.trending_by_category(session, period_days=period_days, limit=limit)
+        principal: Principal | None = Depends(get_principal_optional),
+) -> Response:
+    async def build() -> bytes:
+        async with get_session() as session:
+            trends = await trending_service.trending_by_category(session, period_days=period_days, limit=limit)
+        return _category_trending_adapter.dump_json(trends)
+
+    payload = await _load_snapshot(f"trending:by-category:{period_days}:{limit}", build)
+    if principal is None:
+        return _viewer_response(payload)
+
+    trends = _category_trending_adapter.validate_json(payload)
+    async with get_session() as session:
+        await like_service.mark_liked_by_me(
+            session, principal.id, [post for trend in trends for post in trend.posts]
+        )
+    return _viewer_response(_category_trending_adapter.dump_json(trends))
 
 
 @router.get("/users", response_model=list[TrendingUser])
 async def trending_users_endpoint(
         period_days: int = Query(30, ge=1, le=365),
         limit: int = Query(10, ge=1, le=50),
-        session: AsyncSession = Depends(get_db_session),
-) -> list[TrendingUser]:
-    return await trending_service.trending_users(session, period_days=period_days, limit=limit)
+) -> Response:
+    async def build() -> bytes:
+        async with get_session() as session:
+            users = await trending_service.trending_users(session, period_days=period_days, limit=limit)
+        return _trending_users_adapter.dump_json(users)
+
+    return await _snapshot_response(f"trending:users:{period_days}:{limit}", build)
@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+import asyncio
+
+from app.db.base import get_session
+from app.services.likes import backfill_daily_rollup
+
+
+async def main() -> None:
+    async with get_session() as session:
+        row_count = await backfill_daily_rollup(session)
+    print(f"post_like_daily rebuilt with {row_count} rows")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
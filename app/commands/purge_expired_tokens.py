@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+import asyncio
+
+from app.db.base import get_session
+from app.services.token_reaper import purge_expired_tokens
+
+
+async def main() -> None:
+    async with get_session() as session:
+        purged = await purge_expired_tokens(session)
+    print(f"purged {purged['auth_codes']} auth_codes and {purged['refresh_tokens']} refresh_tokens")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
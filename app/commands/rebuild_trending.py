@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+import asyncio
+
+from app.db.base import get_session
+from app.services.leaderboard import rebuild_leaderboards
+from app.utils.redis import close_redis
+
+
+async def main() -> None:
+    async with get_session() as session:
+        rebuilt = await rebuild_leaderboards(session)
+    await close_redis()
+    for horizon, post_count in rebuilt.items():
+        print(f"trending:{horizon}d rebuilt with {post_count} posts")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
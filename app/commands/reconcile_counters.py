@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+import asyncio
+
+from app.services.counters import reconcile_all_counters
+
+
+async def main() -> None:
+    corrected = await reconcile_all_counters()
+    for field, count in corrected.items():
+        print(f"{field}: corrected {count} posts")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -16,6 +16,12 @@ class JWTSettings(BaseModel):
     algorithm: str = Field("HS256", description="Signing algorithm for JWT tokens")
     access_token_ttl_minutes: int = Field(15, ge=5, le=120, description="Minutes before access token expires")
     refresh_token_ttl_days: int = Field(30, ge=1, le=120, description="Days before refresh token expires")
+    refresh_reuse_grace_seconds: int = Field(
+        10, ge=0, le=300, description="Seconds a rotated refresh token may be replayed before its chain is revoked"
+    )
+    verified_token_cache_size: int = Field(
+        50000, ge=0, le=1_000_000, description="Verified tokens remembered per worker until they expire"
+    )
 
 
 class MailSettings(BaseModel):
@@ -42,6 +48,18 @@ class SecuritySettings(BaseModel):
     same_site: Literal["lax", "strict", "none"] = Field("lax", description="SameSite policy for cookies")
 
 
+class RateLimitSettings(BaseModel):
+    likes_per_minute: int = Field(60, ge=1, description="Like toggles allowed per user per minute")
+    comments_per_minute: int = Field(10, ge=1, description="Comments allowed per user per minute")
+    upload_signatures_per_minute: int = Field(20, ge=1, description="Upload signatures issued per user per minute")
+    local_prefixes: dict[str, float] = Field(
+        default_factory=dict,
+        description="Key prefixes decided in-process between Redis syncs, mapped to the share of the "
+        "remaining quota each worker may spend locally (0-1)",
+    )
+    local_sync_seconds: float = Field(1.0, gt=0, le=60, description="Maximum age of a local lease")
+
+
 class AppSettings(BaseSettings):
     model_config = SettingsConfigDict(
         env_file=Path(".env"), env_prefix="APP_", env_nested_delimiter="__"
@@ -60,12 +78,69 @@ class AppSettings(BaseSettings):
     mail: MailSettings
     cloudinary: CloudinarySettings
     security: SecuritySettings = Field(default_factory=SecuritySettings)
+    rate_limits: RateLimitSettings = Field(default_factory=RateLimitSettings)
     otp_code_length: int = Field(6, ge=4, le=10)
     otp_ttl_minutes: int = Field(10, ge=5, le=30)
     otp_retry_limit: int = Field(5, ge=1, le=10)
+    otp_audit_enabled: bool = Field(False, description="Mirror OTP issue/consume events into auth_codes")
     otp_request_limit_per_email: int = Field(20, ge=1, le=100)
     otp_request_limit_window_minutes: int = Field(30, ge=5, le=180)
     otp_request_limit_per_ip: int = Field(20, ge=1, le=200)
+    post_view_tracking: Literal["key", "hll"] = Field(
+        "key",
+        description="Deduplicate post views with one key per viewer or an hourly HyperLogLog per post",
+    )
+    post_view_hll_retention_hours: int = Field(168, ge=1, le=720)
+    trending_engine: Literal["sql", "redis"] = Field(
+        "redis", description="Serve trending posts from decayed Redis leaderboards or raw SQL aggregation"
+    )
+    trending_snapshot_fresh_seconds: int = Field(60, ge=1, le=3600)
+    trending_snapshot_stale_seconds: int = Field(
+        3600, ge=60, le=86400, description="Seconds a stale trending snapshot may be served while it is rebuilt"
+    )
+    user_cache_local_size: int = Field(10000, ge=0, le=1_000_000, description="Users kept in each worker's LRU")
+    markdown_executor: Literal["process", "thread"] = Field(
+        "process", description="Pool used to render and sanitize large markdown documents"
+    )
+    markdown_executor_workers: int = Field(2, ge=1, le=32)
+    markdown_offload_threshold_chars: int = Field(
+        20000, ge=0, description="Documents shorter than this are rendered on the event loop"
+    )
+    markdown_sanitizer: Literal["bleach", "tokens"] = Field(
+        "bleach",
+        description="Sanitize rendered HTML with bleach or the markdown-it token stream (escapes raw HTML)",
+    )
+    markdown_block_cache_size: int = Field(
+        20000, ge=0, description="Sanitized markdown blocks reused across renders in each process"
+    )
+    counter_flush_interval_seconds: int = Field(
+        10, ge=1, le=300, description="Seconds between flushes of buffered post counters to Postgres"
+    )
+    token_reaper_interval_seconds: int = Field(
+        3600, ge=60, le=86400, description="Seconds between purges of expired auth codes and refresh tokens"
+    )
+    token_reaper_batch_size: int = Field(5000, ge=100, le=100_000, description="Rows deleted per transaction")
+    auth_code_retention_days: int = Field(
+        7, ge=0, le=365, description="Days expired auth code audit rows are kept"
+    )
+    post_counter_store: Literal["postgres", "redis"] = Field(
+        "redis", description="Apply like/comment counter changes to posts directly or buffer them in Redis"
+    )
+    counter_reconcile_interval_seconds: int = Field(
+        86400, ge=600, description="Seconds between recounts of post counters from their source tables"
+    )
+    comment_cache_ttl_seconds: int = Field(
+        300, ge=0, le=86400, description="Seconds a cached comment page may be served (author details can lag)"
+    )
+    background_tasks_enabled: bool = Field(True, description="Run counter flushers and cache listeners in-process")
+    email_delivery: Literal["inline", "celery"] = Field(
+        "celery", description="Send OTP emails inside the request or through the Celery worker"
+    )
+    celery_broker_url: str | None = Field(
+        None,
+        description="Celery broker URI, defaults to the Redis URL; queued OTP emails carry the "
+        "plaintext code, so the broker must be trusted like the app itself",
+    )
     resend_tracking: bool = Field(True, description="Enable message tracking metadata on emails")
 
 
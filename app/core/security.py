@@ -1,6 +1,7 @@
 import hashlib
 import hmac
 import secrets
+import time
 from datetime import UTC, datetime, timedelta
 from typing import Any, Dict, Optional
 
@@ -8,6 +9,7 @@ import jwt
 from fastapi import Request
 
 from app.core.config import settings
+from app.utils.lru import TTLCache
 
 
 def _current_time() -> datetime:
@@ -44,8 +46,30 @@ def create_refresh_token(subject: str, token_id: str, extra: Optional[Dict[str,
     return jwt.encode(payload, settings.jwt.secret_key, algorithm=settings.jwt.algorithm)
 
 
+_verified_tokens: TTLCache[bytes, Dict[str, Any]] = TTLCache(
+    maxsize=settings.jwt.verified_token_cache_size, ttl_seconds=0
+)
+
+
 def decode_token(token: str) -> Dict[str, Any]:
-    return jwt.decode(token, settings.jwt.secret_key, algorithms=[settings.jwt.algorithm])
+    digest = hashlib.sha256(token.encode("utf-8")).digest()
+    cached = _verified_tokens.get(digest)
+    if cached is not None:
+        return dict(cached)
+    payload = jwt.decode(token, settings.jwt.secret_key, algorithms=[settings.jwt.algorithm])
+    expires_at = payload.get("exp")
+    if isinstance(expires_at, (int, float)):
+        _verified_tokens.set(digest, payload, ttl_seconds=expires_at - time.time())
+    return dict(payload)
+
+
+def verified_token_cache_stats() -> Dict[str, float]:
+    return {
+        "size": len(_verified_tokens),
+        "hits": _verified_tokens.hits,
+        "misses": _verified_tokens.misses,
+        "hit_rate": _verified_tokens.hit_rate,
+    }
 
 
 def hash_token(value: str) -> str:
@@ -1,8 +1,9 @@
 from app.db.models.base import Base
 from app.db.models.blog import Blog
 from app.db.models.comment import Comment
+from app.db.models.counter import CounterFlush
 from app.db.models.image import ImageAsset
-from app.db.models.like import PostLike
+from app.db.models.like import PostLike, PostLikeDaily
 from app.db.models.post import Post
 from app.db.models.tag import PostTag, Tag
 from app.db.models.token import AuthCode, RefreshToken
@@ -17,7 +18,9 @@ __all__ = [
     "PostTag",
     "Comment",
     "PostLike",
+    "PostLikeDaily",
     "AuthCode",
     "RefreshToken",
     "ImageAsset",
+    "CounterFlush",
 ]
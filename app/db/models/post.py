@@ -3,7 +3,18 @@ from __future__ import annotations
 from datetime import UTC, datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import CheckConstraint, DateTime, Enum, ForeignKey, Integer, String, Text, UniqueConstraint
+from sqlalchemy import (
+    CheckConstraint,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    UniqueConstraint,
+    text,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.models.base import Base
@@ -21,6 +32,14 @@ class Post(Base):
     __table_args__ = (
         UniqueConstraint("blog_id", "slug", name="uq_posts_blog_slug"),
         CheckConstraint("char_length(title) BETWEEN 1 AND 120", name="ck_posts_title_length"),
+        Index(
+            "ix_posts_blog_feed",
+            "blog_id",
+            "status",
+            text("published_at DESC NULLS LAST"),
+            text("created_at DESC"),
+            text("id DESC"),
+        ),
     )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
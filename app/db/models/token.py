@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import UTC, datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, Integer, String, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.models.base import Base
@@ -14,6 +14,10 @@ if TYPE_CHECKING:
 
 class AuthCode(Base):
     __tablename__ = "auth_codes"
+    __table_args__ = (
+        Index("ix_auth_codes_expires_at", "expires_at"),
+        Index("ix_auth_codes_live_email", "email", postgresql_where=text("NOT consumed")),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     email: Mapped[str] = mapped_column(String(254), index=True, nullable=False)
@@ -31,6 +35,15 @@ class AuthCode(Base):
 
 class RefreshToken(Base):
     __tablename__ = "refresh_tokens"
+    __table_args__ = (
+        Index("ix_refresh_tokens_expires_at", "expires_at"),
+        Index("ix_refresh_tokens_live_user_id", "user_id", postgresql_where=text("NOT revoked")),
+        Index(
+            "ix_refresh_tokens_rotated_from_id",
+            "rotated_from_id",
+            postgresql_where=text("rotated_from_id IS NOT NULL"),
+        ),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True)
     user_id: Mapped[str] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
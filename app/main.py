@@ -1,19 +1,40 @@
 from __future__ import annotations
 
+import asyncio
 from collections.abc import AsyncIterator
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.routes import api_router
 from app.core.config import settings
+from app.services.counters import run_counter_flusher, run_counter_reconciler
+from app.services.email import resend_client
+from app.services.token_reaper import run_token_reaper
+from app.services.user_cache import run_invalidation_listener as run_user_invalidation_listener
+from app.utils.markdown import shutdown_markdown_executor
 from app.utils.redis import close_redis
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    background_tasks: list[asyncio.Task[None]] = []
+    if settings.background_tasks_enabled:
+        background_tasks = [
+            asyncio.create_task(run_counter_flusher(settings.counter_flush_interval_seconds)),
+            asyncio.create_task(run_counter_reconciler(settings.counter_reconcile_interval_seconds)),
+            asyncio.create_task(run_user_invalidation_listener()),
+            asyncio.create_task(run_token_reaper(settings.token_reaper_interval_seconds)),
+        ]
     yield
+    for task in background_tasks:
+        task.cancel()
+    for task in background_tasks:
+        with suppress(asyncio.CancelledError):
+            await task
+    shutdown_markdown_executor()
+    await resend_client.aclose()
     await close_redis()
 
 
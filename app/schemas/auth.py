@@ -14,6 +14,11 @@ class OTPVerify(BaseModel):
     code: str = Field(..., min_length=4, max_length=10)
 
 
+class Principal(BaseModel):
+    id: str
+    onboarding_completed: bool
+
+
 class AuthResponse(BaseModel):
     user: UserPublic
     onboarding_required: bool
@@ -24,3 +24,10 @@ class CommentPublic(BaseModel):
     author: UserPublic
 
     model_config = {"from_attributes": True}
+
+
+class CommentThread(CommentPublic):
+    reply_count: int = 0
+    has_more_replies: bool = False
+    replies_cursor: str | None = None
+    replies: list[CommentThread] = Field(default_factory=list)
@@ -22,6 +22,13 @@ class PaginatedResponse(BaseModel, Generic[T]):
     size: int
 
 
+class CursorPaginatedResponse(BaseModel, Generic[T]):
+    items: Sequence[T]
+    next_cursor: str | None = None
+    size: int
+    total: int | None = None
+
+
 class MetaResponse(BaseModel):
     data: dict
     error: dict | None = None
@@ -28,6 +28,7 @@ class PostSummary(BaseModel):
     published_at: datetime | None
     created_at: datetime
     updated_at: datetime
+    liked_by_me: bool | None = None
 
     model_config = {"from_attributes": True}
 
@@ -38,6 +39,13 @@ class PostDetail(PostSummary):
     tags: list[PostTagInfo]
 
 
+class PostViewStats(BaseModel):
+    post_id: int
+    view_count: int
+    unique_viewers: int | None
+    window_hours: int
+
+
 class PostCreate(BaseModel):
     title: str = Field(..., min_length=1, max_length=120)
     category: PostCategory
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
+import asyncio
 from datetime import UTC, datetime, timedelta
 from typing import Tuple
 from uuid import uuid4
 
+import structlog
 from fastapi import HTTPException, Request, status
-from sqlalchemy import select, update
+from sqlalchemy import insert, literal, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import set_auth_cookies, clear_auth_cookies
@@ -17,53 +19,37 @@ from app.core.security import (
     hash_otp_code,
     hash_token,
 )
-from app.db.models.token import AuthCode, RefreshToken
+from app.db.models.token import RefreshToken
 from app.db.models.user import User
+from app.services import otp_store
 from app.services.email import resend_client
-from app.utils.rate_limit import enforce_rate_limit
+from app.tasks.email import send_otp_email_task
+from app.utils.rate_limit import RateLimitRule, enforce_rate_limits
 from app.utils.redis import get_redis
 
-
-async def _invalidate_existing_codes(session: AsyncSession, email: str) -> None:
-    await session.execute(
-        update(AuthCode)
-        .where(AuthCode.email == email, AuthCode.consumed.is_(False))
-        .values(consumed=True, consumed_at=datetime.now(UTC))
-    )
+logger = structlog.get_logger(__name__)
 
 
 async def request_otp(session: AsyncSession, email: str, request: Request) -> None:
     normalized_email = email.strip().lower()
     ip = request.client.host if request.client else "unknown"
     fingerprint = f"{normalized_email}:{ip}"
-    await enforce_rate_limit(
-        key=f"otp:req:email:{normalized_email}",
-        limit=settings.otp_request_limit_per_email,
-        window_seconds=settings.otp_request_limit_window_minutes * 60,
-    )
-    await enforce_rate_limit(
-        key=f"otp:req:ip:{ip}",
-        limit=settings.otp_request_limit_per_ip,
-        window_seconds=settings.otp_request_limit_window_minutes * 60,
+    window_seconds = settings.otp_request_limit_window_minutes * 60
+    await enforce_rate_limits(
+        RateLimitRule(f"otp:req:email:{normalized_email}", settings.otp_request_limit_per_email, window_seconds),
+        RateLimitRule(f"otp:req:ip:{ip}", settings.otp_request_limit_per_ip, window_seconds),
     )
 
     code = generate_otp_code(settings.otp_code_length)
-    code_hash = hash_otp_code(code, normalized_email)
-    expires_at = datetime.now(UTC) + timedelta(minutes=settings.otp_ttl_minutes)
-
-    await _invalidate_existing_codes(session, normalized_email)
-
-    auth_code = AuthCode(
-        email=normalized_email,
-        code_hash=code_hash,
-        expires_at=expires_at,
-        consumed=False,
+    await otp_store.store_code(
+        normalized_email,
+        hash_otp_code(code, normalized_email),
         ip_fingerprint=fingerprint,
         user_agent=request.headers.get("user-agent"),
     )
-    session.add(auth_code)
-    await session.commit()
 
+    if settings.email_delivery == "celery" and await _enqueue_otp_email(normalized_email, code):
+        return
     try:
         await resend_client.send_otp_email(
             email=normalized_email,
@@ -74,6 +60,21 @@ async def request_otp(session: AsyncSession, email: str, request: Request) -> No
         raise HTTPException(status_code=500, detail="Failed to send email") from exc
 
 
+async def _enqueue_otp_email(email: str, code: str) -> bool:
+    # Publishing is blocking I/O, so it runs off the event loop and fails fast instead of sitting
+    # in kombu's connection retries; the caller then sends the email inline.
+    try:
+        await asyncio.to_thread(
+            send_otp_email_task.apply_async,
+            kwargs={"email": email, "code": code, "expires_in_minutes": settings.otp_ttl_minutes},
+            retry=False,
+        )
+    except Exception:  # noqa: BLE001
+        logger.warning("email.otp_enqueue_failed", exc_info=True)
+        return False
+    return True
+
+
 async def verify_otp(
         session: AsyncSession,
         email: str,
@@ -81,35 +82,10 @@ async def verify_otp(
         response,
 ) -> Tuple[User, str, str]:
     normalized_email = email.strip().lower()
-    stmt = (
-        select(AuthCode)
-        .where(AuthCode.email == normalized_email, AuthCode.consumed.is_(False))
-        .order_by(AuthCode.created_at.desc())
-        .limit(1)
-    )
-    result = await session.execute(stmt)
-    auth_code = result.scalar_one_or_none()
-    if not auth_code:
+    check = await otp_store.check_code(normalized_email, hash_otp_code(code, normalized_email))
+    if check is not otp_store.OtpCheck.valid:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid code")
 
-    now = datetime.now(UTC)
-    if auth_code.expires_at < now:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Code expired")
-
-    expected_hash = hash_otp_code(code, normalized_email)
-    if auth_code.code_hash != expected_hash:
-        auth_code.attempt_count += 1
-        await session.commit()
-        if auth_code.attempt_count >= settings.otp_retry_limit:
-            auth_code.consumed = True
-            auth_code.consumed_at = now
-            await session.commit()
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid code")
-
-    auth_code.consumed = True
-    auth_code.consumed_at = now
-    await session.commit()
-
     user = await _get_or_create_user(session, normalized_email)
 
     access_token, refresh_token, refresh_model = await _issue_tokens(session, user)
@@ -132,9 +108,13 @@ async def _get_or_create_user(session: AsyncSession, email: str) -> User:
     return user
 
 
+def issue_access_token(user_id: str, onboarded: bool) -> str:
+    return create_access_token(user_id, extra={"typ": "access", "onboarded": onboarded})
+
+
 async def _issue_tokens(session: AsyncSession, user: User) -> Tuple[str, str, RefreshToken]:
     token_id = str(uuid4())
-    access_token = create_access_token(user.id, extra={"typ": "access"})
+    access_token = issue_access_token(user.id, user.onboarding_completed)
     refresh_token = create_refresh_token(user.id, token_id, extra={"typ": "refresh"})
     refresh_model = RefreshToken(
         id=token_id,
@@ -146,22 +126,86 @@ async def _issue_tokens(session: AsyncSession, user: User) -> Tuple[str, str, Re
     return access_token, refresh_token, refresh_model
 
 
-async def rotate_refresh_token(session: AsyncSession, token: RefreshToken) -> Tuple[str, str, RefreshToken]:
-    token.revoked = True
-    token.revoked_at = datetime.now(UTC)
-
+async def rotate_refresh_token(
+        session: AsyncSession,
+        token_hash_value: str,
+        user_id: str,
+) -> Tuple[User, str, str]:
+    # Revoking the presented token, inserting its successor and loading the owner happen in one
+    # statement; the successor's JWT only needs the user id, which the caller already verified.
+    now = datetime.now(UTC)
     new_token_id = str(uuid4())
-    access_token = create_access_token(token.user_id, extra={"typ": "access"})
-    refresh_token = create_refresh_token(token.user_id, new_token_id, extra={"typ": "refresh"})
-    new_model = RefreshToken(
-        id=new_token_id,
-        user_id=token.user_id,
-        token_hash=hash_token(refresh_token),
-        expires_at=datetime.now(UTC) + timedelta(days=settings.jwt.refresh_token_ttl_days),
-        rotated_from_id=token.id,
+    refresh_token = create_refresh_token(user_id, new_token_id, extra={"typ": "refresh"})
+
+    revoked = (
+        update(RefreshToken)
+        .where(
+            RefreshToken.token_hash == token_hash_value,
+            RefreshToken.user_id == user_id,
+            RefreshToken.revoked.is_(False),
+            RefreshToken.expires_at > now,
+        )
+        .values(revoked=True, revoked_at=now)
+        .returning(RefreshToken.id, RefreshToken.user_id)
+        .cte("revoked")
+    )
+    inserted = (
+        insert(RefreshToken)
+        .from_select(
+            ["id", "user_id", "token_hash", "created_at", "expires_at", "rotated_from_id", "revoked"],
+            select(
+                literal(new_token_id),
+                revoked.c.user_id,
+                literal(hash_token(refresh_token)),
+                literal(now),
+                literal(now + timedelta(days=settings.jwt.refresh_token_ttl_days)),
+                revoked.c.id,
+                literal(False),
+            ),
+        )
+        .returning(RefreshToken.id)
+        .cte("inserted")
+    )
+    stmt = (
+        select(User)
+        .join(revoked, User.id == revoked.c.user_id)
+        .add_cte(inserted)
+        .execution_options(populate_existing=True)
+    )
+    user = (await session.execute(stmt)).scalar_one_or_none()
+    if user is None:
+        await session.rollback()
+        await _handle_rejected_refresh(session, token_hash_value, now)
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token revoked")
+    await session.commit()
+
+    access_token = issue_access_token(user.id, user.onboarding_completed)
+    return user, access_token, refresh_token
+
+
+async def _handle_rejected_refresh(session: AsyncSession, token_hash_value: str, now: datetime) -> None:
+    stmt = select(RefreshToken.id, RefreshToken.revoked_at).where(
+        RefreshToken.token_hash == token_hash_value, RefreshToken.revoked.is_(True)
+    )
+    replayed = (await session.execute(stmt)).one_or_none()
+    if replayed is None or replayed.revoked_at is None:
+        return
+    # Tabs refreshing concurrently race on the same token; the losers are not treated as theft.
+    if now - replayed.revoked_at <= timedelta(seconds=settings.jwt.refresh_reuse_grace_seconds):
+        return
+
+    # A rotated token presented again means it leaked: revoke every token issued from it.
+    chain = select(RefreshToken.id).where(RefreshToken.id == replayed.id).cte("chain", recursive=True)
+    chain = chain.union_all(
+        select(RefreshToken.id).join(chain, RefreshToken.rotated_from_id == chain.c.id)
+    )
+    await session.execute(
+        update(RefreshToken)
+        .where(RefreshToken.id.in_(select(chain.c.id)), RefreshToken.revoked.is_(False))
+        .values(revoked=True, revoked_at=now)
     )
-    session.add(new_model)
-    return access_token, refresh_token, new_model
+    await session.commit()
+    logger.warning("auth.refresh_token_reused", token_id=replayed.id)
 
 
 async def revoke_refresh_token(session: AsyncSession, token: RefreshToken) -> None:
@@ -170,17 +214,6 @@ async def revoke_refresh_token(session: AsyncSession, token: RefreshToken) -> No
     await session.commit()
 
 
-async def get_refresh_token(session: AsyncSession, token_hash_value: str) -> RefreshToken | None:
-    stmt = select(RefreshToken).where(RefreshToken.token_hash == token_hash_value)
-    result = await session.execute(stmt)
-    token = result.scalar_one_or_none()
-    if token and token.revoked:
-        return None
-    if token and token.expires_at < datetime.now(UTC):
-        return None
-    return token
-
-
 async def clear_session(response, session: AsyncSession, refresh_token_hash: str | None) -> None:
     clear_auth_cookies(response)
     if refresh_token_hash:
@@ -192,10 +225,31 @@ async def clear_session(response, session: AsyncSession, refresh_token_hash: str
     await session.commit()
 
 
+def _view_hll_key(post_id: int, hour_bucket: int) -> str:
+    return f"views:hll:{post_id}:{hour_bucket}"
+
+
+def _current_hour_bucket() -> int:
+    return int(datetime.now(UTC).timestamp()) // 3600
+
+
 async def record_post_view(post_id: int, fingerprint: str, ttl_seconds: int = 3600) -> bool:
     redis = await get_redis()
-    key = f"views:{post_id}:{fingerprint}"
-    was_set = await redis.setnx(key, "1")
-    if was_set:
-        await redis.expire(key, ttl_seconds)
+    if settings.post_view_tracking == "hll":
+        key = _view_hll_key(post_id, _current_hour_bucket())
+        tx = redis.pipeline(transaction=False)
+        tx.pfadd(key, fingerprint)
+        tx.expire(key, settings.post_view_hll_retention_hours * 3600)
+        added, _ = await tx.execute()
+        return bool(added)
+    was_set = await redis.set(f"views:{post_id}:{fingerprint}", "1", nx=True, ex=ttl_seconds)
     return bool(was_set)
+
+
+async def count_unique_post_viewers(post_id: int, hours: int) -> int | None:
+    if settings.post_view_tracking != "hll":
+        return None
+    redis = await get_redis()
+    current = _current_hour_bucket()
+    keys = [_view_hll_key(post_id, bucket) for bucket in range(current - hours + 1, current + 1)]
+    return await redis.pfcount(*keys)
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from collections.abc import Awaitable, Callable
+from typing import NamedTuple
+
+from app.core.config import settings
+from app.utils.redis import get_redis
+
+# Every page is its own key named after the post's generation, so each expires on its own TTL.
+# Writers bump the generation, which orphans the old pages until they expire; a reader that built a
+# page from Postgres only stores it if the generation it started from is still current, so a page
+# computed before a concurrent write can never be cached after that write's invalidation. Only
+# cursors the server handed out in a cached page are cacheable, which keeps the number of pages per
+# generation bounded by the comments themselves rather than by what clients send. Page and cursor
+# keys are derived from the generation inside the scripts, which assumes a single Redis node.
+_READ_SCRIPT = """
+local generation = redis.call('GET', KEYS[1]) or '0'
+if ARGV[3] ~= '' and redis.call('SISMEMBER', ARGV[4] .. generation, ARGV[3]) == 0 then
+    return {generation, false, 0}
+end
+return {generation, redis.call('GET', ARGV[1] .. generation .. ':' .. ARGV[2]) or false, 1}
+"""
+
+_STORE_SCRIPT = """
+local generation = redis.call('GET', KEYS[1]) or '0'
+if generation ~= ARGV[1] then
+    return 0
+end
+local ttl = tonumber(ARGV[5])
+redis.call('SET', ARGV[2] .. generation .. ':' .. ARGV[3], ARGV[4], 'EX', ttl)
+if #ARGV > 6 then
+    local cursors = ARGV[6] .. generation
+    for i = 7, #ARGV do
+        redis.call('SADD', cursors, ARGV[i])
+    end
+    redis.call('EXPIRE', cursors, ttl)
+end
+return 1
+"""
+
+GENERATION_TTL_SECONDS = 7 * 24 * 60 * 60
+
+
+class Page(NamedTuple):
+    payload: bytes
+    cursors: tuple[str, ...] = ()
+
+
+PageBuilder = Callable[[], Awaitable[Page]]
+
+
+def _generation_key(post_id: int) -> str:
+    return f"comments:gen:{post_id}"
+
+
+def _page_prefix(post_id: int) -> str:
+    return f"comments:page:{post_id}:"
+
+
+def _cursors_prefix(post_id: int) -> str:
+    return f"comments:cursors:{post_id}:"
+
+
+def page_field(*parts: object) -> str:
+    return ":".join("" if part is None else str(part) for part in parts)
+
+
+async def get_page(
+        post_id: int,
+        field: str,
+        build: PageBuilder,
+        *,
+        cursor: str | None = None,
+        cacheable: bool = True,
+) -> bytes:
+    if not cacheable or settings.comment_cache_ttl_seconds <= 0:
+        return (await build()).payload
+    redis = await get_redis()
+    generation, payload, known = await redis.register_script(_READ_SCRIPT)(
+        keys=[_generation_key(post_id)],
+        args=[_page_prefix(post_id), field, cursor or "", _cursors_prefix(post_id)],
+    )
+    if payload is not None:
+        # The shared client decodes responses, so hits come back as str.
+        return payload.encode("utf-8")
+    page = await build()
+    if known:
+        await redis.register_script(_STORE_SCRIPT)(
+            keys=[_generation_key(post_id)],
+            args=[
+                generation,
+                _page_prefix(post_id),
+                field,
+                page.payload,
+                settings.comment_cache_ttl_seconds,
+                _cursors_prefix(post_id),
+                *page.cursors,
+            ],
+        )
+    return page.payload
+
+
+async def invalidate(post_id: int) -> None:
+    redis = await get_redis()
+    tx = redis.pipeline(transaction=True)
+    tx.incr(_generation_key(post_id))
+    tx.expire(_generation_key(post_id), GENERATION_TTL_SECONDS)
+    await tx.execute()
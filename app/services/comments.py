@@ -1,14 +1,125 @@
 from __future__ import annotations
 
-from sqlalchemy import select
+from collections.abc import Mapping, Sequence
+
+from sqlalchemy import and_, func, insert, literal, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import aliased, selectinload
 
+from app.core.config import settings
 from app.db.models.comment import Comment
 from app.db.models.post import Post
 from app.db.models.user import User
-from app.schemas.comment import CommentCreate, CommentPublic
+from app.schemas.comment import CommentCreate, CommentPublic, CommentThread
 from app.schemas.user import UserPublic
+from app.services import comment_cache
+from app.services import counters as counter_service
+from app.utils.cursor import decode_comment_cursor, encode_comment_cursor
+
+
+def _thread_node(item: Comment) -> CommentThread:
+    return CommentThread(
+        id=item.id,
+        post_id=item.post_id,
+        user_id=item.user_id,
+        content="" if item.is_deleted else item.content,
+        is_deleted=item.is_deleted,
+        depth=item.depth,
+        created_at=item.created_at,
+        updated_at=item.updated_at,
+        author=UserPublic.model_validate(item.author),
+    )
+
+
+async def list_comment_threads(
+        session: AsyncSession,
+        post: Post,
+        *,
+        parent_id: int | None = None,
+        size: int,
+        cursor: str | None = None,
+        reply_limit: int = 3,
+        reply_depth: int = 2,
+) -> tuple[list[CommentThread], str | None]:
+    # One keyset page of comments under ``parent_id`` (top level when None), then at most
+    # ``reply_limit`` replies per comment for ``reply_depth`` levels, one query per level.
+    parent_filter = Comment.parent_id.is_(None) if parent_id is None else Comment.parent_id == parent_id
+    stmt = (
+        select(Comment)
+        .where(Comment.post_id == post.id, parent_filter)
+        .order_by(Comment.created_at.asc(), Comment.id.asc())
+        .limit(size + 1)
+        .options(selectinload(Comment.author))
+    )
+    if cursor:
+        position = decode_comment_cursor(cursor)
+        stmt = stmt.where(tuple_(Comment.created_at, Comment.id) > tuple_(position.created_at, position.id))
+    page = list((await session.scalars(stmt)).all())
+    next_cursor = None
+    if len(page) > size:
+        page = page[:size]
+        next_cursor = encode_comment_cursor(page[-1].created_at, page[-1].id)
+
+    loaded = list(page)
+    frontier = [item.id for item in page]
+    for _ in range(reply_depth):
+        if not frontier or reply_limit <= 0:
+            break
+        ranked = (
+            select(
+                Comment.id,
+                func.row_number()
+                .over(partition_by=Comment.parent_id, order_by=(Comment.created_at, Comment.id))
+                .label("position"),
+            )
+            .where(Comment.post_id == post.id, Comment.parent_id.in_(frontier))
+            .subquery()
+        )
+        level_stmt = (
+            select(Comment)
+            .join(ranked, ranked.c.id == Comment.id)
+            .where(ranked.c.position <= reply_limit)
+            .order_by(Comment.created_at.asc(), Comment.id.asc())
+            .options(selectinload(Comment.author))
+        )
+        level = list((await session.scalars(level_stmt)).all())
+        loaded.extend(level)
+        frontier = [item.id for item in level]
+
+    reply_counts: dict[int, int] = {}
+    if loaded:
+        count_stmt = (
+            select(Comment.parent_id, func.count(Comment.id))
+            .where(Comment.post_id == post.id, Comment.parent_id.in_([item.id for item in loaded]))
+            .group_by(Comment.parent_id)
+        )
+        reply_counts = {row[0]: row[1] for row in (await session.execute(count_stmt)).all()}
+
+    return link_comment_threads(loaded, reply_counts), next_cursor
+
+
+def link_comment_threads(
+        loaded: Sequence[Comment], reply_counts: Mapping[int, int]
+) -> list[CommentThread]:
+    # Parents are always loaded before their replies, so a single pass links the tree. A node with
+    # unloaded replies gets a cursor after its last loaded reply, or none when no reply was loaded,
+    # which makes /replies start from the first one.
+    nodes: dict[int, CommentThread] = {}
+    roots: list[CommentThread] = []
+    for item in loaded:
+        node = _thread_node(item)
+        node.reply_count = reply_counts.get(item.id, 0)
+        nodes[item.id] = node
+        parent = nodes.get(item.parent_id) if item.parent_id is not None else None
+        if parent is None:
+            roots.append(node)
+        else:
+            parent.replies.append(node)
+    for node in nodes.values():
+        node.has_more_replies = node.reply_count > len(node.replies)
+        if node.has_more_replies and node.replies:
+            node.replies_cursor = encode_comment_cursor(node.replies[-1].created_at, node.replies[-1].id)
+    return roots
 
 
 async def list_comments(session: AsyncSession, post: Post) -> list[CommentPublic]:
@@ -37,27 +148,34 @@ async def list_comments(session: AsyncSession, post: Post) -> list[CommentPublic
 
 
 async def add_comment(session: AsyncSession, post: Post, user: User, payload: CommentCreate) -> CommentPublic:
-    depth = 0
-    if payload.parent_id:
-        parent = await session.get(Comment, payload.parent_id)
-        if parent and parent.post_id == post.id:
-            depth = parent.depth + 1
-        else:
-            payload.parent_id = None
-
-    comment = Comment(
-        post_id=post.id,
-        user_id=user.id,
-        parent_id=payload.parent_id,
-        content=payload.content,
-        depth=depth,
+    # The parent is resolved by a LEFT JOIN inside the INSERT (a reply to a comment on another post
+    # becomes a top-level comment) and RETURNING hands back the stored row, so nothing is re-read.
+    parent = aliased(Comment, name="parent")
+    anchor = select(literal(1).label("one")).subquery("anchor")
+    source = select(
+        literal(post.id, Comment.post_id.type),
+        literal(user.id, Comment.user_id.type),
+        parent.id,
+        literal(payload.content, Comment.content.type),
+        func.coalesce(parent.depth + 1, 0),
+    ).select_from(
+        anchor.outerjoin(parent, and_(parent.id == payload.parent_id, parent.post_id == post.id))
     )
-    session.add(comment)
-
-    post.comment_count += 1
-    await session.commit()
-    await session.refresh(comment)
-    await session.refresh(post)
+    comment = await session.scalar(
+        insert(Comment)
+        .from_select(["post_id", "user_id", "parent_id", "content", "depth"], source)
+        .returning(Comment)
+    )
+    if settings.post_counter_store == "postgres":
+        await session.execute(
+            update(Post)
+            .where(Post.id == post.id)
+            .values(comment_count=Post.comment_count + 1, updated_at=Post.updated_at)
+        )
+        await session.commit()
+    else:
+        await counter_service.commit_with_pending(session, "comment_count", post.id, 1)
+    await comment_cache.invalidate(post.id)
 
     return CommentPublic(
         id=comment.id,
@@ -78,12 +196,24 @@ async def delete_comment(
         *,
         hard_delete: bool = False,
 ) -> None:
-    post = await session.get(Post, comment.post_id)
+    was_visible = not comment.is_deleted
+    post_id = comment.post_id
+    buffered = was_visible and settings.post_counter_store == "redis"
+    if buffered:
+        await session.execute(counter_service.post_counter_lock(post_id))
     if hard_delete:
         await session.delete(comment)
     else:
         comment.is_deleted = True
         comment.content = ""
-    if post and post.comment_count > 0:
-        post.comment_count -= 1
-    await session.commit()
+    if was_visible and settings.post_counter_store == "postgres":
+        await session.execute(
+            update(Post)
+            .where(Post.id == post_id)
+            .values(comment_count=func.greatest(Post.comment_count - 1, 0), updated_at=Post.updated_at)
+        )
+    if buffered:
+        await counter_service.commit_with_pending(session, "comment_count", post_id, -1)
+    else:
+        await session.commit()
+    await comment_cache.invalidate(post_id)
@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import UTC, datetime, timedelta
+from typing import Literal
+from uuid import uuid4
+
+import structlog
+from sqlalchemy import Integer, ScalarSelect, Select, column, delete, exists, func, select, update, values
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.base import SessionLocal
+from app.db.models.comment import Comment
+from app.db.models.counter import CounterFlush
+from app.db.models.like import PostLike
+from app.db.models.post import Post
+from app.utils.redis import get_redis
+
+logger = structlog.get_logger(__name__)
+
+CounterField = Literal["view_count", "like_count", "comment_count"]
+COUNTER_FIELDS: tuple[CounterField, ...] = ("view_count", "like_count", "comment_count")
+FLUSH_LOCK_TIMEOUT_SECONDS = 60
+RECONCILE_LOCK_TIMEOUT_SECONDS = 600
+RECONCILE_BATCH_SIZE = 1000
+FLUSH_BATCH_RETENTION_DAYS = 7
+
+# Renames the pending hash to the flushing hash under a new batch id, or hands back the batch a
+# failed run left behind. Returns nil when there is nothing to flush.
+_TAKE_BATCH_SCRIPT = """
+if redis.call('EXISTS', KEYS[2]) == 1 then
+    local batch = redis.call('GET', KEYS[3])
+    if not batch then
+        batch = ARGV[1]
+        redis.call('SET', KEYS[3], batch)
+    end
+    return batch
+end
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return false
+end
+redis.call('RENAME', KEYS[1], KEYS[2])
+redis.call('SET', KEYS[3], ARGV[1])
+return ARGV[1]
+"""
+
+
+def _pending_key(field: CounterField) -> str:
+    return f"counters:{field}:pending"
+
+
+def _flushing_key(field: CounterField) -> str:
+    return f"counters:{field}:flushing"
+
+
+async def increment_pending(field: CounterField, post_id: int, amount: int = 1) -> int:
+    redis = await get_redis()
+    tx = redis.pipeline(transaction=False)
+    tx.hincrby(_pending_key(field), str(post_id), amount)
+    tx.hget(_flushing_key(field), str(post_id))
+    pending, flushing = await tx.execute()
+    return int(pending) + int(flushing or 0)
+
+
+async def get_pending(field: CounterField, post_id: int) -> int:
+    redis = await get_redis()
+    tx = redis.pipeline(transaction=False)
+    tx.hget(_pending_key(field), str(post_id))
+    tx.hget(_flushing_key(field), str(post_id))
+    pending, flushing = await tx.execute()
+    return int(pending or 0) + int(flushing or 0)
+
+
+def post_counter_lock(post_id: int) -> Select[tuple[int]]:
+    # Writers that only touch the post through a foreign key get this lock implicitly on insert;
+    # deletes take it explicitly so a reconcile cannot run between their write and their delta.
+    return select(Post.id).where(Post.id == post_id).with_for_update(read=True, key_share=True)
+
+
+async def commit_with_pending(
+        session: AsyncSession, field: CounterField, post_id: int, amount: int
+) -> int:
+    # The delta is buffered before the commit so a reconcile, which locks the post rows, never
+    # sees the change in the source rows without it. A failed commit takes the delta back.
+    if amount:
+        pending = await increment_pending(field, post_id, amount)
+    else:
+        pending = await get_pending(field, post_id)
+    try:
+        await session.commit()
+    except Exception:
+        if amount:
+            await increment_pending(field, post_id, -amount)
+        raise
+    return pending
+
+
+def _flush_batch_key(field: CounterField) -> str:
+    return f"counters:{field}:flushing-batch"
+
+
+def _flush_lock_key(field: CounterField) -> str:
+    return f"counters:{field}:flush-lock"
+
+
+async def get_pending_counts(post_id: int) -> dict[CounterField, int]:
+    redis = await get_redis()
+    tx = redis.pipeline(transaction=False)
+    for field in COUNTER_FIELDS:
+        tx.hget(_pending_key(field), str(post_id))
+        tx.hget(_flushing_key(field), str(post_id))
+    raw = await tx.execute()
+    return {
+        field: int(raw[index * 2] or 0) + int(raw[index * 2 + 1] or 0)
+        for index, field in enumerate(COUNTER_FIELDS)
+    }
+
+
+async def flush_counter(session: AsyncSession, field: CounterField) -> int:
+    redis = await get_redis()
+    lock = redis.lock(_flush_lock_key(field), timeout=FLUSH_LOCK_TIMEOUT_SECONDS)
+    if not await lock.acquire(blocking=False):
+        return 0
+    try:
+        return await _flush_counter_locked(session, field)
+    finally:
+        await lock.release()
+
+
+async def _flush_counter_locked(session: AsyncSession, field: CounterField) -> int:
+    redis = await get_redis()
+    flushing_key = _flushing_key(field)
+    batch_key = _flush_batch_key(field)
+    # New increments land in a fresh pending hash while the renamed one is applied. A flushing
+    # hash left behind by a failed run is retried, under its original batch id, before new deltas
+    # are taken.
+    batch_id = await redis.register_script(_TAKE_BATCH_SCRIPT)(
+        keys=[_pending_key(field), flushing_key, batch_key], args=[uuid4().hex]
+    )
+    if batch_id is None:
+        return 0
+
+    raw = await redis.hgetall(flushing_key)
+    rows = [(int(post_id), int(delta)) for post_id, delta in raw.items() if int(delta)]
+    if rows:
+        # The batch id is recorded in the same statement that applies the deltas, so a batch whose
+        # commit landed but whose Redis cleanup did not is skipped when it is retried.
+        recorded = (
+            pg_insert(CounterFlush)
+            .values(batch_id=batch_id, field=field)
+            .on_conflict_do_nothing(index_elements=[CounterFlush.batch_id])
+            .returning(CounterFlush.batch_id)
+            .cte("recorded")
+        )
+        deltas = values(column("post_id", Integer), column("delta", Integer), name="deltas").data(rows)
+        target = getattr(Post, field)
+        stmt = (
+            update(Post)
+            .where(Post.id == deltas.c.post_id, exists(select(recorded.c.batch_id)))
+            .values({target: target + deltas.c.delta, Post.updated_at: Post.updated_at})
+            .add_cte(recorded)
+            .execution_options(synchronize_session=False)
+        )
+        await session.execute(stmt)
+        await session.execute(
+            delete(CounterFlush).where(
+                CounterFlush.applied_at < datetime.now(UTC) - timedelta(days=FLUSH_BATCH_RETENTION_DAYS)
+            )
+        )
+        await session.commit()
+    await redis.delete(flushing_key, batch_key)
+    return len(rows)
+
+
+async def flush_all_counters() -> None:
+    async with SessionLocal() as session:
+        for field in COUNTER_FIELDS:
+            flushed = await flush_counter(session, field)
+            if flushed:
+                logger.info("counters.flushed", field=field, posts=flushed)
+
+
+async def run_counter_flusher(interval_seconds: int) -> None:
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await flush_all_counters()
+        except asyncio.CancelledError:
+            raise
+        except Exception:  # noqa: BLE001
+            logger.exception("counters.flush_failed")
+
+
+def _source_count(field: CounterField) -> ScalarSelect[int] | None:
+    if field == "like_count":
+        return select(func.count(PostLike.id)).where(PostLike.post_id == Post.id).scalar_subquery()
+    if field == "comment_count":
+        return (
+            select(func.count(Comment.id))
+            .where(Comment.post_id == Post.id, Comment.is_deleted.is_(False))
+            .scalar_subquery()
+        )
+    return None
+
+
+async def reconcile_counter(session: AsyncSession, field: CounterField) -> int:
+    source = _source_count(field)
+    if source is None:
+        return 0
+    redis = await get_redis()
+    lock = redis.lock(_flush_lock_key(field), timeout=RECONCILE_LOCK_TIMEOUT_SECONDS)
+    if not await lock.acquire(blocking=False):
+        return 0
+    try:
+        await _flush_counter_locked(session, field)
+        target = getattr(Post, field)
+        max_id = await session.scalar(select(func.max(Post.id))) or 0
+        corrected = 0
+        for low in range(0, max_id + 1, RECONCILE_BATCH_SIZE):
+            in_batch = (Post.id >= low, Post.id < low + RECONCILE_BATCH_SIZE)
+            # Writers buffer their delta before committing, while they still hold a key-share
+            # lock on the post row, so once these rows are locked every change visible in the
+            # source rows has its delta in the pending hash. Those deltas land again when they
+            # are flushed, so they are subtracted here.
+            post_ids = list(
+                (await session.scalars(select(Post.id).where(*in_batch).with_for_update())).all()
+            )
+            if not post_ids:
+                await session.commit()
+                continue
+            raw = await redis.hmget(_pending_key(field), [str(post_id) for post_id in post_ids])
+            rows = [(post_id, int(delta)) for post_id, delta in zip(post_ids, raw) if int(delta or 0)]
+            expected = source
+            if rows:
+                pending = values(
+                    column("post_id", Integer), column("delta", Integer), name="pending"
+                ).data(rows)
+                pending_delta = (
+                    select(pending.c.delta).where(pending.c.post_id == Post.id).scalar_subquery()
+                )
+                expected = source - func.coalesce(pending_delta, 0)
+            result = await session.execute(
+                update(Post)
+                .where(*in_batch, target != expected)
+                .values({target: expected, Post.updated_at: Post.updated_at})
+                .execution_options(synchronize_session=False)
+            )
+            await session.commit()
+            corrected += result.rowcount
+        return corrected
+    finally:
+        await lock.release()
+
+
+async def reconcile_all_counters() -> dict[CounterField, int]:
+    corrected: dict[CounterField, int] = {}
+    async with SessionLocal() as session:
+        for field in COUNTER_FIELDS:
+            if _source_count(field) is not None:
+                corrected[field] = await reconcile_counter(session, field)
+    return corrected
+
+
+async def run_counter_reconciler(interval_seconds: int) -> None:
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            corrected = await reconcile_all_counters()
+            logger.info("counters.reconciled", **corrected)
+        except asyncio.CancelledError:
+            raise
+        except Exception:  # noqa: BLE001
+            logger.exception("counters.reconcile_failed")
@@ -6,13 +6,39 @@ import httpx
 
 from app.core.config import settings
 
+_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60.0)
+
 
 class ResendClient:
     def __init__(self, api_key: str, base_url: str = "https://api.resend.com") -> None:
         self.api_key = api_key
         self.base_url = base_url.rstrip("/")
+        self._async_client: httpx.AsyncClient | None = None
+        self._sync_client: httpx.Client | None = None
 
-    async def send_otp_email(self, *, email: str, code: str, expires_in_minutes: int) -> None:
+    @property
+    def _headers(self) -> dict[str, str]:
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        if self._async_client is None or self._async_client.is_closed:
+            self._async_client = httpx.AsyncClient(
+                base_url=self.base_url, timeout=10.0, http2=True, limits=_LIMITS, headers=self._headers
+            )
+        return self._async_client
+
+    def _get_sync_client(self) -> httpx.Client:
+        if self._sync_client is None or self._sync_client.is_closed:
+            self._sync_client = httpx.Client(
+                base_url=self.base_url, timeout=10.0, http2=True, limits=_LIMITS, headers=self._headers
+            )
+        return self._sync_client
+
+    @staticmethod
+    def build_otp_payload(*, email: str, code: str, expires_in_minutes: int) -> dict[str, Any]:
         payload: dict[str, Any] = {
             "from": settings.mail.from_email,
             "to": [email],
@@ -24,14 +50,25 @@ class ResendClient:
             payload["data"] = {"code": code, "expires_in": expires_in_minutes}
         else:
             payload["html"] = f"<p>인증 코드: <strong>{code}</strong></p>"
+        return payload
 
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
-        async with httpx.AsyncClient(base_url=self.base_url, timeout=10.0) as client:
-            response = await client.post("/emails", json=payload, headers=headers)
-            response.raise_for_status()
+    async def send_otp_email(self, *, email: str, code: str, expires_in_minutes: int) -> None:
+        payload = self.build_otp_payload(email=email, code=code, expires_in_minutes=expires_in_minutes)
+        response = await self._get_async_client().post("/emails", json=payload)
+        response.raise_for_status()
+
+    def send_otp_email_sync(self, *, email: str, code: str, expires_in_minutes: int) -> None:
+        payload = self.build_otp_payload(email=email, code=code, expires_in_minutes=expires_in_minutes)
+        response = self._get_sync_client().post("/emails", json=payload)
+        response.raise_for_status()
+
+    async def aclose(self) -> None:
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+        if self._sync_client is not None:
+            self._sync_client.close()
+            self._sync_client = None
 
 
 resend_client = ResendClient(settings.mail.api_key)
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+
+import structlog
+from sqlalchemy import Float, cast, extract, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.like import PostLike
+from app.utils.redis import get_redis
+
+logger = structlog.get_logger(__name__)
+
+# Each horizon keeps its own sorted set whose scores halve every ``horizon`` days. Scores are
+# stored as ``weight * 2 ** ((t - epoch) / half_life)`` so ordering never needs a periodic decay
+# pass; the epoch is advanced (and every score rescaled) before the exponent gets large.
+HORIZON_DAYS: tuple[int, ...] = (1, 7, 30, 365)
+REBASE_AFTER_HALF_LIVES = 32
+MIN_SCORE = 1e-9
+
+_RECORD_EVENT_SCRIPT = """
+local now = tonumber(ARGV[3])
+local half_life = tonumber(ARGV[4])
+local epoch = tonumber(redis.call('GET', KEYS[2]))
+if not epoch then
+    epoch = now
+    redis.call('SET', KEYS[2], epoch)
+end
+local elapsed = (now - epoch) / half_life
+if elapsed > tonumber(ARGV[5]) then
+    local shift = math.floor(elapsed)
+    redis.call('ZUNIONSTORE', KEYS[1], 1, KEYS[1], 'WEIGHTS', 2 ^ (-shift))
+    epoch = epoch + shift * half_life
+    redis.call('SET', KEYS[2], epoch)
+end
+local exponent = (tonumber(ARGV[6]) - epoch) / half_life
+local score = redis.call('ZINCRBY', KEYS[1], tonumber(ARGV[2]) * 2 ^ exponent, ARGV[1])
+if tonumber(score) < tonumber(ARGV[7]) then
+    redis.call('ZREM', KEYS[1], ARGV[1])
+end
+return score
+"""
+
+
+def _board_key(horizon_days: int) -> str:
+    return f"trending:posts:{horizon_days}d"
+
+
+def _epoch_key(horizon_days: int) -> str:
+    return f"trending:posts:{horizon_days}d:epoch"
+
+
+def horizon_for_period(period_days: int) -> int:
+    for horizon in HORIZON_DAYS:
+        if period_days <= horizon:
+            return horizon
+    return HORIZON_DAYS[-1]
+
+
+async def record_post_event(post_id: int, weight: float, occurred_at: datetime | None = None) -> None:
+    redis = await get_redis()
+    script = redis.register_script(_RECORD_EVENT_SCRIPT)
+    now = datetime.now(UTC).timestamp()
+    event_time = occurred_at.timestamp() if occurred_at else now
+    tx = redis.pipeline(transaction=False)
+    for horizon in HORIZON_DAYS:
+        await script(
+            keys=[_board_key(horizon), _epoch_key(horizon)],
+            args=[
+                post_id,
+                weight,
+                now,
+                horizon * 86400,
+                REBASE_AFTER_HALF_LIVES,
+                event_time,
+                MIN_SCORE,
+            ],
+            client=tx,
+        )
+    await tx.execute()
+
+
+async def record_like(post_id: int, liked: bool, liked_at: datetime | None = None) -> None:
+    # An unlike removes exactly what the original like contributed, so it is weighted at the
+    # time the like was cast rather than now.
+    try:
+        await record_post_event(post_id, 1.0 if liked else -1.0, liked_at)
+    except Exception:  # noqa: BLE001
+        logger.warning("leaderboard.record_failed", post_id=post_id, exc_info=True)
+
+
+async def top_post_ids(period_days: int, limit: int) -> list[int]:
+    redis = await get_redis()
+    members = await redis.zrevrange(_board_key(horizon_for_period(period_days)), 0, limit - 1)
+    return [int(member) for member in members]
+
+
+async def rebuild_leaderboards(session: AsyncSession) -> dict[int, int]:
+    redis = await get_redis()
+    now = datetime.now(UTC)
+    rebuilt: dict[int, int] = {}
+    for horizon in HORIZON_DAYS:
+        half_life = horizon * 86400
+        # Likes older than this contribute less than 2 ** -32 of a fresh like.
+        since = now - timedelta(days=horizon * REBASE_AFTER_HALF_LIVES)
+        exponent = cast(extract("epoch", PostLike.created_at - now), Float) / half_life
+        stmt = (
+            select(PostLike.post_id, func.sum(func.power(2.0, exponent)))
+            .where(PostLike.created_at >= since)
+            .group_by(PostLike.post_id)
+        )
+        result = await session.execute(stmt)
+        scores = {str(post_id): float(score) for post_id, score in result if score >= MIN_SCORE}
+
+        staging_key = f"{_board_key(horizon)}:rebuild"
+        tx = redis.pipeline(transaction=True)
+        tx.delete(staging_key)
+        if scores:
+            tx.zadd(staging_key, scores)
+            tx.rename(staging_key, _board_key(horizon))
+        else:
+            tx.delete(_board_key(horizon))
+        tx.set(_epoch_key(horizon), now.timestamp())
+        await tx.execute()
+        rebuilt[horizon] = len(scores)
+    return rebuilt
@@ -1,26 +1,179 @@
 from __future__ import annotations
 
-from sqlalchemy import delete, select
+from collections.abc import Iterable, Sequence
+from datetime import UTC, date, datetime
+
+from fastapi import HTTPException, status
+from sqlalchemy import (
+    ARRAY,
+    ColumnElement,
+    Date,
+    Integer,
+    any_,
+    cast,
+    delete,
+    exists,
+    func,
+    insert,
+    literal,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.models.like import PostLike
+from app.core.config import settings
+from app.db.models.like import PostLike, PostLikeDaily
 from app.db.models.post import Post
 from app.db.models.user import User
+from app.schemas.post import PostSummary
+from app.services import counters as counter_service
+from app.services import leaderboard
+
+
+def _utc_date(value: ColumnElement[datetime]) -> ColumnElement[date]:
+    return cast(func.timezone("UTC", value), Date)
 
 
 async def toggle_like(session: AsyncSession, post: Post, user: User) -> tuple[bool, int]:
-    stmt = select(PostLike).where(PostLike.post_id == post.id, PostLike.user_id == user.id)
-    result = await session.execute(stmt)
-    like = result.scalar_one_or_none()
-    liked = False
-    if like:
-        await session.execute(delete(PostLike).where(PostLike.id == like.id))
-        post.like_count = max(0, post.like_count - 1)
+    # One statement removes the caller's like or adds one and keeps the daily rollup in step.
+    # With counters in Postgres it also moves posts.like_count by the net change: toggles
+    # serialize on the post row, so the counter always matches the rows. With counters buffered
+    # in Redis the net change is added to the pending delta before commit instead, and
+    # like_count catches up on the next flush. In both modes a lost insert race is a no-op
+    # instead of a unique violation.
+    now = datetime.now(UTC)
+    locked = counter_service.post_counter_lock(post.id).cte("locked")
+    removed = (
+        delete(PostLike)
+        .where(
+            PostLike.post_id == post.id,
+            PostLike.user_id == user.id,
+            exists(select(locked.c.id)),
+        )
+        .returning(PostLike.created_at)
+        .cte("removed")
+    )
+    added = (
+        pg_insert(PostLike)
+        .from_select(
+            ["post_id", "user_id", "created_at"],
+            select(
+                literal(post.id, PostLike.post_id.type),
+                literal(user.id, PostLike.user_id.type),
+                literal(now, PostLike.created_at.type),
+            ).where(~exists(select(removed.c.created_at))),
+        )
+        .on_conflict_do_nothing(constraint="uq_post_likes_user_post")
+        .returning(PostLike.created_at)
+        .cte("added")
+    )
+    delta = (
+        select(func.count()).select_from(added).scalar_subquery()
+        - select(func.count()).select_from(removed).scalar_subquery()
+    )
+    counted = (
+        update(Post)
+        .where(Post.id == post.id)
+        .values(like_count=func.greatest(Post.like_count + delta, 0), updated_at=Post.updated_at)
+        .returning(Post.like_count)
+        .cte("counted")
+    )
+
+    rollup_added = pg_insert(PostLikeDaily).from_select(
+        ["post_id", "day", "blog_id", "category", "likes"],
+        select(
+            literal(post.id, PostLikeDaily.post_id.type),
+            _utc_date(added.c.created_at),
+            literal(post.blog_id, PostLikeDaily.blog_id.type),
+            literal(post.category, PostLikeDaily.category.type),
+            literal(1),
+        ).select_from(added),
+    )
+    rollup_added = (
+        rollup_added.on_conflict_do_update(
+            index_elements=[PostLikeDaily.post_id, PostLikeDaily.day],
+            set_={"likes": PostLikeDaily.likes + rollup_added.excluded.likes},
+        )
+        .returning(PostLikeDaily.post_id)
+        .cte("rollup_added")
+    )
+    rollup_removed = (
+        update(PostLikeDaily)
+        .where(
+            PostLikeDaily.post_id == post.id,
+            PostLikeDaily.day == _utc_date(removed.c.created_at),
+            PostLikeDaily.likes > 0,
+        )
+        .values(likes=PostLikeDaily.likes - 1)
+        .returning(PostLikeDaily.post_id)
+        .cte("rollup_removed")
+    )
+
+    liked_at = select(added.c.created_at).scalar_subquery().label("liked_at")
+    unliked_from = select(removed.c.created_at).scalar_subquery().label("unliked_from")
+    if settings.post_counter_store == "postgres":
+        stmt = select(counted.c.like_count, liked_at, unliked_from)
+    else:
+        # The counter change is buffered in Redis, so hot posts never queue on their posts row.
+        stmt = select(liked_at, unliked_from)
+    row = (await session.execute(stmt.add_cte(rollup_added, rollup_removed))).one_or_none()
+    if settings.post_counter_store == "postgres":
+        await session.commit()
+        if row is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found")
+        like_count = row.like_count
     else:
-        like = PostLike(post_id=post.id, user_id=user.id)
-        session.add(like)
-        post.like_count += 1
-        liked = True
+        delta = (row.liked_at is not None) - (row.unliked_from is not None)
+        pending = await counter_service.commit_with_pending(session, "like_count", post.id, delta)
+        like_count = max(0, post.like_count + pending)
+
+    if row.liked_at is not None:
+        await leaderboard.record_like(post.id, True, row.liked_at)
+    elif row.unliked_from is not None:
+        await leaderboard.record_like(post.id, False, row.unliked_from)
+    # Neither branch fires only when a concurrent toggle inserted the like first.
+    return row.unliked_from is None, like_count
+
+
+async def liked_post_ids(session: AsyncSession, user_id: str, post_ids: Sequence[int]) -> set[int]:
+    if not post_ids:
+        return set()
+    # A single array parameter keeps one cached plan regardless of page size; the lookup is
+    # served by the (user_id, post_id) unique index.
+    stmt = select(PostLike.post_id).where(
+        PostLike.user_id == user_id,
+        PostLike.post_id == any_(literal(list(post_ids), ARRAY(Integer))),
+    )
+    return set((await session.scalars(stmt)).all())
+
+
+async def mark_liked_by_me(session: AsyncSession, user_id: str, posts: Iterable[PostSummary]) -> None:
+    posts = list(posts)
+    liked = await liked_post_ids(session, user_id, [post.id for post in posts])
+    for post in posts:
+        post.liked_by_me = post.id in liked
+
+
+async def sync_rollup_category(session: AsyncSession, post: Post) -> None:
+    await session.execute(
+        update(PostLikeDaily).where(PostLikeDaily.post_id == post.id).values(category=post.category)
+    )
+
+
+async def backfill_daily_rollup(session: AsyncSession) -> int:
+    day = _utc_date(PostLike.created_at)
+    source = (
+        select(PostLike.post_id, day, Post.blog_id, Post.category, func.count(PostLike.id))
+        .join(Post, Post.id == PostLike.post_id)
+        .group_by(PostLike.post_id, day, Post.blog_id, Post.category)
+    )
+    await session.execute(delete(PostLikeDaily))
+    result = await session.execute(
+        insert(PostLikeDaily).from_select(
+            ["post_id", "day", "blog_id", "category", "likes"],
+            source,
+        )
+    )
     await session.commit()
-    await session.refresh(post)
-    return liked, post.like_count
+    return result.rowcount
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Coroutine
+from datetime import UTC, datetime, timedelta
+from enum import Enum
+from typing import Any
+
+import structlog
+from sqlalchemy import update
+
+from app.core.config import settings
+from app.db.base import get_session
+from app.db.models.token import AuthCode
+from app.utils.redis import get_redis
+
+logger = structlog.get_logger(__name__)
+
+# Returns {outcome, attempts[, stored_hash]}. Outcome is 1 when the code matches (the entry is
+# consumed), 0 when no live code exists, -1 for a wrong code with attempts left and -2 for the wrong
+# code that exhausts them (the entry is dropped).
+_VERIFY_SCRIPT = """
+local stored = redis.call('HGET', KEYS[1], 'code_hash')
+if not stored then
+    return {0, 0}
+end
+if stored == ARGV[1] then
+    local attempts = tonumber(redis.call('HGET', KEYS[1], 'attempts'))
+    redis.call('DEL', KEYS[1])
+    return {1, attempts, stored}
+end
+local attempts = redis.call('HINCRBY', KEYS[1], 'attempts', 1)
+if attempts >= tonumber(ARGV[2]) then
+    redis.call('DEL', KEYS[1])
+    return {-2, attempts, stored}
+end
+return {-1, attempts}
+"""
+
+
+class OtpCheck(Enum):
+    valid = 1
+    missing = 0
+    invalid = -1
+    exhausted = -2
+
+
+_audit_tasks: set[asyncio.Task[None]] = set()
+
+
+def _otp_key(email: str) -> str:
+    return f"otp:code:{email}"
+
+
+async def store_code(
+        email: str,
+        code_hash: str,
+        *,
+        ip_fingerprint: str | None = None,
+        user_agent: str | None = None,
+) -> None:
+    # Overwriting the hash replaces any earlier code for the address, so at most one is live.
+    redis = await get_redis()
+    key = _otp_key(email)
+    tx = redis.pipeline(transaction=True)
+    tx.delete(key)
+    tx.hset(key, mapping={"code_hash": code_hash, "attempts": 0})
+    tx.expire(key, settings.otp_ttl_minutes * 60)
+    await tx.execute()
+    if settings.otp_audit_enabled:
+        _spawn_audit(_audit_issued(email, code_hash, ip_fingerprint, user_agent))
+
+
+async def check_code(email: str, code_hash: str) -> OtpCheck:
+    redis = await get_redis()
+    script = redis.register_script(_VERIFY_SCRIPT)
+    outcome, attempts, *stored = await script(
+        keys=[_otp_key(email)], args=[code_hash, settings.otp_retry_limit]
+    )
+    result = OtpCheck(int(outcome))
+    if settings.otp_audit_enabled and stored:
+        _spawn_audit(_audit_closed(email, stored[0], int(attempts)))
+    return result
+
+
+def _spawn_audit(coro: Coroutine[Any, Any, None]) -> None:
+    task = asyncio.create_task(coro)
+    _audit_tasks.add(task)
+    task.add_done_callback(_audit_tasks.discard)
+
+
+async def _audit_issued(email: str, code_hash: str, ip_fingerprint: str | None, user_agent: str | None) -> None:
+    now = datetime.now(UTC)
+    try:
+        async with get_session() as session:
+            session.add(
+                AuthCode(
+                    email=email,
+                    code_hash=code_hash,
+                    expires_at=now + timedelta(minutes=settings.otp_ttl_minutes),
+                    consumed=False,
+                    ip_fingerprint=ip_fingerprint,
+                    user_agent=user_agent,
+                    created_at=now,
+                )
+            )
+            await session.commit()
+    except Exception:  # noqa: BLE001
+        logger.warning("otp.audit_failed", email=email, exc_info=True)
+
+
+async def _audit_closed(email: str, code_hash: str, attempts: int) -> None:
+    try:
+        async with get_session() as session:
+            await session.execute(
+                update(AuthCode)
+                .where(
+                    AuthCode.email == email,
+                    AuthCode.code_hash == code_hash,
+                    AuthCode.consumed.is_(False),
+                )
+                .values(consumed=True, consumed_at=datetime.now(UTC), attempt_count=attempts)
+            )
+            await session.commit()
+    except Exception:  # noqa: BLE001
+        logger.warning("otp.audit_failed", email=email, exc_info=True)
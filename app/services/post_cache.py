@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import hashlib
+
+from app.db.models.post import Post
+from app.schemas.post import PostDetail
+from app.utils.redis import get_redis
+
+RENDER_CACHE_TTL_SECONDS = 24 * 60 * 60
+VOLATILE_FIELDS = frozenset({"like_count", "comment_count", "view_count", "liked_by_me"})
+
+
+def _render_key(post_id: int) -> str:
+    return f"posts:render:{post_id}"
+
+
+def _version(post: Post) -> str:
+    return post.updated_at.isoformat()
+
+
+async def get_rendered(post: Post) -> tuple[str, str] | None:
+    redis = await get_redis()
+    version, body, digest = await redis.hmget(_render_key(post.id), ["version", "body", "digest"])
+    if version != _version(post) or body is None or digest is None:
+        return None
+    return body, digest
+
+
+async def store_rendered(post: Post, detail: PostDetail) -> tuple[str, str]:
+    # Counters change far more often than content and liked_by_me depends on the viewer, so they
+    # are merged in per request instead of being part of the cached body.
+    body = detail.model_dump_json(exclude=set(VOLATILE_FIELDS))
+    digest = hashlib.sha256(body.encode("utf-8")).hexdigest()[:32]
+    redis = await get_redis()
+    key = _render_key(post.id)
+    tx = redis.pipeline(transaction=True)
+    tx.delete(key)
+    tx.hset(key, mapping={"version": _version(post), "body": body, "digest": digest})
+    tx.expire(key, RENDER_CACHE_TTL_SECONDS)
+    await tx.execute()
+    return body, digest
+
+
+async def invalidate(post_id: int) -> None:
+    redis = await get_redis()
+    await redis.delete(_render_key(post_id))
+
+
+def compose_body(
+        static_body: str,
+        *,
+        like_count: int,
+        comment_count: int,
+        view_count: int,
+        liked_by_me: bool | None = None,
+) -> str:
+    liked = "null" if liked_by_me is None else ("true" if liked_by_me else "false")
+    return (
+        f'{static_body[:-1]},"like_count":{like_count},"comment_count":{comment_count},'
+        f'"view_count":{view_count},"liked_by_me":{liked}}}'
+    )
+
+
+def compute_etag(
+        digest: str,
+        *,
+        like_count: int,
+        comment_count: int,
+        view_count: int,
+        liked_by_me: bool | None = None,
+) -> str:
+    liked = "" if liked_by_me is None else f"-{int(liked_by_me)}"
+    return f'"{digest}-{like_count}-{comment_count}-{view_count}{liked}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
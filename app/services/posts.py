@@ -3,9 +3,9 @@ from __future__ import annotations
 from datetime import UTC, datetime
 from typing import Iterable
 
-from sqlalchemy import Select, delete, func, select
+from sqlalchemy import Select, and_, delete, func, or_, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import defer, selectinload, undefer
 
 from app.core.security import generate_slug
 from app.db.models.blog import Blog
@@ -13,20 +13,24 @@ from app.db.models.enums import PostCategory, PostStatus
 from app.db.models.post import Post
 from app.db.models.tag import PostTag, Tag
 from app.schemas.post import PostCreate, PostDetail, PostSummary, PostTagInfo, PostUpdate
-from app.utils.markdown import markdown_to_html
+from app.services import comment_cache, post_cache
+from app.services.likes import sync_rollup_category
+from app.utils.cursor import decode_post_cursor, encode_post_cursor
+from app.utils.markdown import render_markdown
+from app.utils.redis import get_redis
 from app.utils.slug import ensure_unique_slug, normalize_slug
 
 
-async def list_posts(
-        session: AsyncSession,
-        *,
+POST_COUNT_CACHE_TTL_SECONDS = 60
+
+
+def _filtered_posts_stmt(
         blog: Blog,
-        page: int,
-        size: int,
+        *,
         tag_slug: str | None = None,
         category: PostCategory | None = None,
         status_filter: PostStatus | None = PostStatus.published,
-) -> tuple[list[PostSummary], int]:
+) -> Select:
     base_stmt: Select = select(Post).where(Post.blog_id == blog.id)
     if status_filter:
         base_stmt = base_stmt.where(Post.status == status_filter)
@@ -35,17 +39,92 @@ async def list_posts(
     if tag_slug:
         base_stmt = base_stmt.join(PostTag, PostTag.post_id == Post.id).join(Tag, Tag.id == PostTag.tag_id)
         base_stmt = base_stmt.where(Tag.slug == tag_slug)
+    return base_stmt
+
+
+def _feed_order(stmt: Select) -> Select:
+    return stmt.order_by(Post.published_at.desc().nulls_last(), Post.created_at.desc(), Post.id.desc())
+
+
+async def list_posts(
+        session: AsyncSession,
+        *,
+        blog: Blog,
+        page: int,
+        size: int,
+        tag_slug: str | None = None,
+        category: PostCategory | None = None,
+        status_filter: PostStatus | None = PostStatus.published,
+) -> tuple[list[PostSummary], int]:
+    base_stmt = _filtered_posts_stmt(blog, tag_slug=tag_slug, category=category, status_filter=status_filter)
 
     total_stmt = select(func.count()).select_from(base_stmt.subquery())
     total = await session.scalar(total_stmt)
 
-    stmt = base_stmt.order_by(Post.published_at.desc().nulls_last(), Post.created_at.desc())
+    stmt = _feed_order(base_stmt)
     stmt = stmt.offset((page - 1) * size).limit(size)
     result = await session.execute(stmt)
     posts = [PostSummary.model_validate(post) for post in result.scalars().all()]
     return posts, total or 0
 
 
+async def list_posts_by_cursor(
+        session: AsyncSession,
+        *,
+        blog: Blog,
+        size: int,
+        cursor: str | None = None,
+        tag_slug: str | None = None,
+        category: PostCategory | None = None,
+        status_filter: PostStatus | None = PostStatus.published,
+) -> tuple[list[PostSummary], str | None]:
+    stmt = _filtered_posts_stmt(blog, tag_slug=tag_slug, category=category, status_filter=status_filter)
+    if cursor:
+        position = decode_post_cursor(cursor)
+        after_position = tuple_(Post.created_at, Post.id) < tuple_(position.created_at, position.id)
+        if position.published_at is None:
+            stmt = stmt.where(Post.published_at.is_(None), after_position)
+        else:
+            stmt = stmt.where(
+                or_(
+                    Post.published_at < position.published_at,
+                    and_(Post.published_at == position.published_at, after_position),
+                    Post.published_at.is_(None),
+                )
+            )
+
+    result = await session.execute(_feed_order(stmt).limit(size + 1))
+    rows = list(result.scalars().all())
+    next_cursor = None
+    if len(rows) > size:
+        rows = rows[:size]
+        last = rows[-1]
+        next_cursor = encode_post_cursor(last.published_at, last.created_at, last.id)
+    return [PostSummary.model_validate(post) for post in rows], next_cursor
+
+
+async def count_posts(
+        session: AsyncSession,
+        *,
+        blog: Blog,
+        tag_slug: str | None = None,
+        category: PostCategory | None = None,
+        status_filter: PostStatus | None = PostStatus.published,
+) -> int:
+    status_key = status_filter.value if status_filter else "all"
+    category_key = category.value if category else "all"
+    cache_key = f"posts:count:{blog.id}:{status_key}:{category_key}:{tag_slug or ''}"
+    redis = await get_redis()
+    cached = await redis.get(cache_key)
+    if cached is not None:
+        return int(cached)
+
+    base_stmt = _filtered_posts_stmt(blog, tag_slug=tag_slug, category=category, status_filter=status_filter)
+    total = await session.scalar(select(func.count()).select_from(base_stmt.subquery())) or 0
+    await redis.set(cache_key, total, ex=POST_COUNT_CACHE_TTL_SECONDS)
+    return total
+
+
 async def _collect_existing_slugs(session: AsyncSession, blog: Blog, base_slug: str,
                                   exclude_post_id: int | None = None) -> set[str]:
     stmt = select(Post.slug).where(Post.blog_id == blog.id, Post.slug.like(f"{base_slug}%"))
@@ -81,7 +160,7 @@ async def create_post(session: AsyncSession, blog: Blog, data: PostCreate) -> Po
         category=category_value,
         status=status_value,
         content_md=data.content_md,
-        content_html=markdown_to_html(data.content_md),
+        content_html=await render_markdown(data.content_md),
     )
     if data.status == PostStatus.published:
         post.published_at = datetime.now(UTC)
@@ -112,6 +191,7 @@ async def update_post(session: AsyncSession, blog: Blog, post: Post, data: PostU
             else str(data.category).lower()
         )
         post.category = PostCategory(normalized_category).value
+        await sync_rollup_category(session, post)
     if data.status and data.status != post.status:
         normalized_status = (
             data.status.value
@@ -123,10 +203,12 @@ async def update_post(session: AsyncSession, blog: Blog, post: Post, data: PostU
             post.published_at = datetime.now(UTC)
     if data.content_md and data.content_md != post.content_md:
         post.content_md = data.content_md
-        post.content_html = markdown_to_html(data.content_md)
+        post.content_html = await render_markdown(data.content_md)
     if data.tags is not None:
         await _sync_tags(session, blog, post, data.tags)
+        post.updated_at = datetime.now(UTC)
     await session.commit()
+    await post_cache.invalidate(post.id)
     stmt = (
         select(Post)
         .where(Post.id == post.id)
@@ -139,6 +221,8 @@ async def update_post(session: AsyncSession, blog: Blog, post: Post, data: PostU
 async def delete_post(session: AsyncSession, post: Post) -> None:
     await session.delete(post)
     await session.commit()
+    await post_cache.invalidate(post.id)
+    await comment_cache.invalidate(post.id)
 
 
 async def get_post_by_slug(
@@ -147,15 +231,34 @@ async def get_post_by_slug(
         slug: str,
         *,
         include_unpublished: bool = False,
+        include_content: bool = True,
 ) -> Post | None:
     stmt = select(Post).where(Post.blog_id == blog.id, Post.slug == slug)
     if not include_unpublished:
         stmt = stmt.where(Post.status == PostStatus.published)
-    stmt = stmt.options(selectinload(Post.tags).selectinload(PostTag.tag))
+    if include_content:
+        stmt = stmt.options(selectinload(Post.tags).selectinload(PostTag.tag))
+    else:
+        stmt = stmt.options(defer(Post.content_md), defer(Post.content_html))
     result = await session.execute(stmt)
     return result.scalar_one_or_none()
 
 
+async def load_post_detail(session: AsyncSession, post_id: int) -> Post:
+    stmt = (
+        select(Post)
+        .where(Post.id == post_id)
+        .options(
+            undefer(Post.content_md),
+            undefer(Post.content_html),
+            selectinload(Post.tags).selectinload(PostTag.tag),
+        )
+        .execution_options(populate_existing=True)
+    )
+    result = await session.execute(stmt)
+    return result.scalar_one()
+
+
 def serialize_post_detail(post: Post) -> PostDetail:
     tag_infos = [
         PostTagInfo(
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import UTC, datetime, timedelta
+
+import structlog
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.base import SessionLocal
+from app.db.models.token import AuthCode, RefreshToken
+from app.utils.redis import get_redis
+
+logger = structlog.get_logger(__name__)
+
+REAPER_LOCK_TIMEOUT_SECONDS = 600
+
+_purged_totals: dict[str, int] = {"auth_codes": 0, "refresh_tokens": 0}
+
+
+def reaper_stats() -> dict[str, int]:
+    return dict(_purged_totals)
+
+
+async def _purge_expired(
+        session: AsyncSession,
+        model: type[AuthCode] | type[RefreshToken],
+        cutoff: datetime,
+        batch_size: int,
+) -> int:
+    # Small batches keep each transaction short so the deletes never hold locks that the login
+    # and refresh paths wait on; SKIP LOCKED lets a concurrent run work on different rows.
+    purged = 0
+    while True:
+        doomed = (
+            select(model.id)
+            .where(model.expires_at < cutoff)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        result = await session.execute(
+            delete(model).where(model.id.in_(doomed)).execution_options(synchronize_session=False)
+        )
+        await session.commit()
+        purged += result.rowcount
+        if result.rowcount < batch_size:
+            return purged
+
+
+async def purge_expired_tokens(session: AsyncSession) -> dict[str, int]:
+    now = datetime.now(UTC)
+    batch_size = settings.token_reaper_batch_size
+    # Revoked refresh tokens stay until they expire so replays can still be recognised.
+    purged = {
+        "auth_codes": await _purge_expired(
+            session, AuthCode, now - timedelta(days=settings.auth_code_retention_days), batch_size
+        ),
+        "refresh_tokens": await _purge_expired(session, RefreshToken, now, batch_size),
+    }
+    for table, count in purged.items():
+        _purged_totals[table] += count
+    return purged
+
+
+async def run_token_reaper(interval_seconds: int) -> None:
+    while True:
+        try:
+            redis = await get_redis()
+            lock = redis.lock("token-reaper:lock", timeout=REAPER_LOCK_TIMEOUT_SECONDS)
+            if await lock.acquire(blocking=False):
+                try:
+                    async with SessionLocal() as session:
+                        purged = await purge_expired_tokens(session)
+                finally:
+                    await lock.release()
+                logger.info("token_reaper.purged", **purged)
+        except asyncio.CancelledError:
+            raise
+        except Exception:  # noqa: BLE001
+            logger.exception("token_reaper.failed")
+        await asyncio.sleep(interval_seconds)
@@ -1,19 +1,36 @@
 from __future__ import annotations
 
-from datetime import UTC, datetime, timedelta
+from datetime import UTC, date, datetime, timedelta
 
-from sqlalchemy import func, select
+from sqlalchemy import Subquery, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import defer, selectinload
 
+from app.core.config import settings
 from app.db.models.blog import Blog
 from app.db.models.enums import PostCategory, PostStatus
-from app.db.models.like import PostLike
+from app.db.models.like import PostLikeDaily
 from app.db.models.post import Post
 from app.db.models.user import User
 from app.schemas.post import PostSummary
 from app.schemas.trending import CategoryTrending, TrendingPost, TrendingUser
 from app.schemas.user import BlogPublic, UserPublic
+from app.services import leaderboard
+
+
+def _since_day(period_days: int) -> date:
+    return (datetime.now(UTC) - timedelta(days=period_days)).date()
+
+
+def _rollup_totals(period_days: int) -> Subquery:
+    likes = func.sum(PostLikeDaily.likes)
+    return (
+        select(PostLikeDaily.post_id, likes.label("likes"))
+        .where(PostLikeDaily.day >= _since_day(period_days))
+        .group_by(PostLikeDaily.post_id)
+        .having(likes > 0)
+        .subquery()
+    )
 
 
 async def trending_posts(
@@ -22,15 +39,19 @@ async def trending_posts(
         period_days: int = 30,
         limit: int = 10,
 ) -> list[TrendingPost]:
-    since = datetime.now(UTC) - timedelta(days=period_days)
+    if settings.trending_engine == "redis":
+        post_ids = await leaderboard.top_post_ids(period_days, limit * 2)
+        if post_ids:
+            return await _hydrate_trending_posts(session, post_ids, limit)
+
+    totals = _rollup_totals(period_days)
     stmt = (
         select(Post)
-        .join(PostLike, PostLike.post_id == Post.id)
-        .where(PostLike.created_at >= since, Post.status == PostStatus.published)
-        .group_by(Post.id)
-        .order_by(func.count(PostLike.id).desc())
+        .join(totals, totals.c.post_id == Post.id)
+        .where(Post.status == PostStatus.published)
+        .order_by(totals.c.likes.desc(), Post.id.desc())
         .limit(limit)
-        .options(selectinload(Post.blog).selectinload(Blog.owner))
+        .options(selectinload(Post.blog), defer(Post.content_md), defer(Post.content_html))
     )
     result = await session.execute(stmt)
     posts = []
@@ -44,48 +65,58 @@ async def trending_posts(
     return posts
 
 
+async def _hydrate_trending_posts(session: AsyncSession, post_ids: list[int], limit: int) -> list[TrendingPost]:
+    stmt = (
+        select(Post)
+        .where(Post.id.in_(post_ids), Post.status == PostStatus.published)
+        .options(selectinload(Post.blog), defer(Post.content_md), defer(Post.content_html))
+    )
+    result = await session.execute(stmt)
+    posts_by_id = {post.id: post for post in result.scalars().all()}
+    ordered = [posts_by_id[post_id] for post_id in post_ids if post_id in posts_by_id][:limit]
+    return [
+        TrendingPost(
+            post=PostSummary.model_validate(post),
+            blog=BlogPublic.model_validate(post.blog),
+        )
+        for post in ordered
+    ]
+
+
 async def trending_by_category(
         session: AsyncSession,
         *,
         period_days: int = 30,
         limit: int = 5,
 ) -> list[CategoryTrending]:
-    since = datetime.now(UTC) - timedelta(days=period_days)
-    stmt = (
+    totals = _rollup_totals(period_days)
+    ranked = (
         select(
-            Post.category,
-            Post.id,
-            func.count(PostLike.id).label("like_count"),
+            Post.id.label("post_id"),
+            func.row_number()
+            .over(partition_by=Post.category, order_by=(totals.c.likes.desc(), Post.id.desc()))
+            .label("rank"),
         )
-        .join(PostLike, PostLike.post_id == Post.id)
-        .where(PostLike.created_at >= since, Post.status == PostStatus.published)
-        .group_by(Post.category, Post.id)
-        .order_by(Post.category, func.count(PostLike.id).desc())
+        .join(totals, totals.c.post_id == Post.id)
+        .where(Post.status == PostStatus.published)
+        .subquery()
+    )
+    stmt = (
+        select(Post)
+        .join(ranked, ranked.c.post_id == Post.id)
+        .where(ranked.c.rank <= limit)
+        .order_by(Post.category, ranked.c.rank)
+        .options(defer(Post.content_md), defer(Post.content_html))
     )
     result = await session.execute(stmt)
-    category_map: dict[PostCategory, list[int]] = {}
-    for category, post_id, _ in result:
-        category_map.setdefault(category, []).append(post_id)
-    trends: list[CategoryTrending] = []
-    for category, post_ids in category_map.items():
-        top_ids = post_ids[:limit]
-        stmt_posts = (
-            select(Post)
-            .where(Post.id.in_(top_ids))
-            .options(selectinload(Post.blog))
-        )
-        posts_result = await session.execute(stmt_posts)
-        posts_by_id = {post.id: post for post in posts_result.scalars().all()}
-        ordered_posts = [posts_by_id[pid] for pid in top_ids if pid in posts_by_id]
-        summaries = [PostSummary.model_validate(p) for p in ordered_posts]
-        trends.append(
-            CategoryTrending(
-                category=category,
-                posts=summaries,
-                generated_at=datetime.now(UTC),
-            )
-        )
-    return trends
+    category_map: dict[PostCategory, list[PostSummary]] = {}
+    for post in result.scalars().all():
+        category_map.setdefault(post.category, []).append(PostSummary.model_validate(post))
+    generated_at = datetime.now(UTC)
+    return [
+        CategoryTrending(category=category, posts=summaries, generated_at=generated_at)
+        for category, summaries in category_map.items()
+    ]
 
 
 async def trending_users(
@@ -94,16 +125,21 @@ async def trending_users(
         period_days: int = 30,
         limit: int = 10,
 ) -> list[TrendingUser]:
-    since = datetime.now(UTC) - timedelta(days=period_days)
+    likes = func.sum(PostLikeDaily.likes)
+    blog_totals = (
+        select(PostLikeDaily.blog_id, likes.label("likes"))
+        .where(PostLikeDaily.day >= _since_day(period_days))
+        .group_by(PostLikeDaily.blog_id)
+        .having(likes > 0)
+        .order_by(likes.desc())
+        .limit(limit)
+        .subquery()
+    )
     stmt = (
-        select(User, Blog, func.count(PostLike.id).label("likes"))
+        select(User, Blog, blog_totals.c.likes)
         .join(Blog, Blog.user_id == User.id)
-        .join(Post, Post.blog_id == Blog.id)
-        .join(PostLike, PostLike.post_id == Post.id)
-        .where(PostLike.created_at >= since)
-        .group_by(User.id, Blog.id)
-        .order_by(func.count(PostLike.id).desc())
-        .limit(limit)
+        .join(blog_totals, blog_totals.c.blog_id == Blog.id)
+        .order_by(blog_totals.c.likes.desc())
     )
     result = await session.execute(stmt)
     trends = []
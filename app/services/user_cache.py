@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime
+from typing import Any
+
+import orjson
+import structlog
+from sqlalchemy import DateTime
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.config import settings
+from app.db.models.user import User
+from app.utils.lru import TTLCache
+from app.utils.redis import get_redis
+
+logger = structlog.get_logger(__name__)
+
+INVALIDATION_CHANNEL = "cache:users:invalidate"
+
+_USER_COLUMNS = tuple(column.key for column in User.__table__.columns)
+_DATETIME_COLUMNS = frozenset(
+    column.key for column in User.__table__.columns if isinstance(column.type, DateTime)
+)
+
+_local_users: TTLCache[str, dict[str, Any]] = TTLCache(
+    maxsize=settings.user_cache_local_size,
+    ttl_seconds=settings.jwt.access_token_ttl_minutes * 60,
+)
+
+
+def _redis_key(user_id: str) -> str:
+    return f"cache:users:{user_id}"
+
+
+def _snapshot(user: User) -> dict[str, Any]:
+    return {key: getattr(user, key) for key in _USER_COLUMNS}
+
+
+def _attach(session: AsyncSession, values: dict[str, Any]) -> User:
+    # A detached instance added to the session becomes persistent without a SELECT, so callers can
+    # refresh relationships or modify it exactly as if it came from session.get().
+    user = User(**values)
+    make_transient_to_detached(user)
+    session.add(user)
+    return user
+
+
+async def get_user(session: AsyncSession, user_id: str) -> User | None:
+    values = _local_users.get(user_id)
+    if values is not None:
+        return _attach(session, values)
+
+    redis = await get_redis()
+    cached = await redis.get(_redis_key(user_id))
+    if cached is not None:
+        values = orjson.loads(cached)
+        for key in _DATETIME_COLUMNS:
+            if values.get(key) is not None:
+                values[key] = datetime.fromisoformat(values[key])
+        _local_users.set(user_id, values)
+        return _attach(session, values)
+
+    user = await session.get(User, user_id)
+    if user is None:
+        return None
+    values = _snapshot(user)
+    _local_users.set(user_id, values)
+    await redis.set(_redis_key(user_id), orjson.dumps(values), ex=settings.jwt.access_token_ttl_minutes * 60)
+    return user
+
+
+async def invalidate_user(user_id: str) -> None:
+    _local_users.pop(user_id)
+    redis = await get_redis()
+    tx = redis.pipeline(transaction=False)
+    tx.delete(_redis_key(user_id))
+    tx.publish(INVALIDATION_CHANNEL, user_id)
+    await tx.execute()
+
+
+async def run_invalidation_listener() -> None:
+    while True:
+        try:
+            redis = await get_redis()
+            async with redis.pubsub() as pubsub:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        _local_users.pop(message["data"])
+        except asyncio.CancelledError:
+            raise
+        except Exception:  # noqa: BLE001
+            # The local tier may have missed invalidations while disconnected.
+            _local_users.clear()
+            logger.warning("user_cache.listener_disconnected", exc_info=True)
+            await asyncio.sleep(1)
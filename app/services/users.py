@@ -8,6 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.models.blog import Blog
 from app.db.models.user import User
 from app.schemas.user import BlogPublic, MeResponse, OnboardingPayload, UserPublic
+from app.services import user_cache
 from app.utils.slug import normalize_slug, is_valid_slug
 
 
@@ -81,6 +82,7 @@ async def complete_onboarding(
         blog.slug = blog_slug
         blog.description = payload.description
     await session.commit()
+    await user_cache.invalidate_user(user.id)
     await session.refresh(user)
     await session.refresh(user, attribute_names=["blog"])
     return user
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import httpx
+import structlog
+from celery import Task
+
+from app.core.config import settings
+from app.services.email import resend_client
+from app.worker import celery_app
+
+logger = structlog.get_logger(__name__)
+
+
+@celery_app.task(
+    bind=True,
+    name="email.send_otp",
+    max_retries=5,
+    default_retry_delay=2,
+)
+def send_otp_email_task(self: Task, *, email: str, code: str, expires_in_minutes: int) -> None:
+    try:
+        resend_client.send_otp_email_sync(email=email, code=code, expires_in_minutes=expires_in_minutes)
+    except httpx.HTTPStatusError as exc:
+        status_code = exc.response.status_code
+        if status_code < 500 and status_code != 429:
+            logger.error("email.otp_rejected", status_code=status_code, email=email)
+            return
+        raise self.retry(exc=exc, countdown=_backoff(self.request.retries)) from exc
+    except httpx.TransportError as exc:
+        raise self.retry(exc=exc, countdown=_backoff(self.request.retries)) from exc
+
+
+def _backoff(retries: int) -> int:
+    # A code is useless once it expires, so retries never wait past its lifetime.
+    return min(2 ** (retries + 1), settings.otp_ttl_minutes * 60 // 4)
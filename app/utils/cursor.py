@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import base64
+import binascii
+from datetime import datetime
+from typing import NamedTuple
+
+import orjson
+
+
+class PostCursor(NamedTuple):
+    published_at: datetime | None
+    created_at: datetime
+    id: int
+
+
+class CommentCursor(NamedTuple):
+    created_at: datetime
+    id: int
+
+
+def _encode(payload: list) -> str:
+    return base64.urlsafe_b64encode(orjson.dumps(payload)).decode("ascii").rstrip("=")
+
+
+def _decode(value: str) -> list:
+    padded = value + "=" * (-len(value) % 4)
+    return orjson.loads(base64.urlsafe_b64decode(padded))
+
+
+def encode_post_cursor(published_at: datetime | None, created_at: datetime, post_id: int) -> str:
+    return _encode(
+        [
+            published_at.isoformat() if published_at else None,
+            created_at.isoformat(),
+            post_id,
+        ]
+    )
+
+
+def decode_post_cursor(value: str) -> PostCursor:
+    try:
+        published_raw, created_raw, post_id = _decode(value)
+        published_at = datetime.fromisoformat(published_raw) if published_raw else None
+        return PostCursor(published_at, datetime.fromisoformat(created_raw), int(post_id))
+    except (binascii.Error, orjson.JSONDecodeError, TypeError, ValueError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def encode_comment_cursor(created_at: datetime, comment_id: int) -> str:
+    return _encode([created_at.isoformat(), comment_id])
+
+
+def decode_comment_cursor(value: str) -> CommentCursor:
+    try:
+        created_raw, comment_id = _decode(value)
+        return CommentCursor(datetime.fromisoformat(created_raw), int(comment_id))
+    except (binascii.Error, orjson.JSONDecodeError, TypeError, ValueError) as exc:
+        raise ValueError("Invalid cursor") from exc
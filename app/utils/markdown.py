@@ -1,7 +1,26 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any
+
 import bleach
+import structlog
+from bleach.sanitizer import Cleaner
 from markdown_it import MarkdownIt
+from markdown_it.rules_core import StateCore
+from markdown_it.token import Token
+
+from app.core.config import settings
+from app.utils.lru import TTLCache
+
+logger = structlog.get_logger(__name__)
+
+BLOCK_CACHE_TTL_SECONDS = 60 * 60
+MAX_PROCESS_POOL_RESTARTS = 3
 
 ALLOWED_TAGS = bleach.sanitizer.ALLOWED_TAGS.union(
     {
@@ -30,12 +49,181 @@ ALLOWED_ATTRIBUTES = {
     "a": {"href", "title", "rel"},
 }
 
+ALLOWED_PROTOCOLS = frozenset(bleach.sanitizer.ALLOWED_PROTOCOLS)
+
 md = MarkdownIt("commonmark", {
     "typographer": True,
 })
 
+_block_cache: TTLCache[str, str] = TTLCache(
+    maxsize=settings.markdown_block_cache_size, ttl_seconds=BLOCK_CACHE_TTL_SECONDS
+)
+_block_cache_lock = threading.Lock()
+_cleaners = threading.local()
+
+
+def _get_cleaner() -> Cleaner:
+    # Cleaner builds its html5lib parser, walker and serializer once; it is not thread-safe, so
+    # every thread (or pool process) gets its own.
+    cleaner = getattr(_cleaners, "cleaner", None)
+    if cleaner is None:
+        cleaner = Cleaner(tags=ALLOWED_TAGS, attributes=ALLOWED_ATTRIBUTES)
+        _cleaners.cleaner = cleaner
+    return cleaner
+
+
+def _sanitize(html: str) -> str:
+    return _get_cleaner().clean(html)
+
+
+def _validate_link(url: str) -> bool:
+    scheme, separator, _ = url.partition(":")
+    if not separator or any(char in scheme for char in "/?#"):
+        return True
+    return scheme.strip().lower() in ALLOWED_PROTOCOLS
+
+
+def _restrict_token_attributes(token: Token) -> None:
+    if token.type == "fence":
+        token.info = ""
+    if token.attrs:
+        allowed = ALLOWED_ATTRIBUTES.get(token.tag, ())
+        token.attrs = {name: value for name, value in token.attrs.items() if name in allowed}
+
+
+def _restrict_attributes(state: StateCore) -> None:
+    for token in state.tokens:
+        _restrict_token_attributes(token)
+        for child in token.children or ():
+            _restrict_token_attributes(child)
+
+
+# Sanitizes the token stream instead of reparsing rendered HTML: raw HTML is escaped as text,
+# links are limited to ALLOWED_PROTOCOLS and attributes to ALLOWED_ATTRIBUTES.
+md_safe = MarkdownIt("commonmark", {
+    "typographer": True,
+    "html": False,
+})
+md_safe.validateLink = _validate_link
+md_safe.core.ruler.push("restrict_attributes", _restrict_attributes)
+
+
+def _top_level_blocks(tokens: list[Token]) -> list[tuple[int, int]]:
+    blocks: list[tuple[int, int]] = []
+    start: int | None = None
+    for index, token in enumerate(tokens):
+        if token.level != 0:
+            continue
+        if start is None:
+            start = index
+        if token.nesting <= 0:
+            blocks.append((start, index + 1))
+            start = None
+    return blocks
+
+
+def _has_raw_html(token: Token) -> bool:
+    if token.type == "html_block":
+        return True
+    return any(child.type == "html_inline" for child in token.children or ())
+
+
+def _render_tokens(parser: MarkdownIt, tokens: list[Token], env: dict[str, Any]) -> str:
+    html = parser.renderer.render(tokens, parser.options, env)
+    return html if parser is md_safe else _sanitize(html)
+
 
 def markdown_to_html(markdown_text: str) -> str:
-    rendered = md.render(markdown_text)
-    sanitized = bleach.clean(rendered, tags=ALLOWED_TAGS, attributes=ALLOWED_ATTRIBUTES)
-    return sanitized
+    parser = md_safe if settings.markdown_sanitizer == "tokens" else md
+    env: dict[str, Any] = {}
+    tokens = parser.parse(markdown_text, env)
+    # Raw HTML, block or inline, can open a tag in one block and close it in another, which only
+    # sanitizes correctly as a whole document.
+    if not tokens or any(_has_raw_html(token) for token in tokens):
+        return _render_tokens(parser, tokens, env)
+
+    # Inline links resolve against reference definitions anywhere in the document, so those are
+    # part of every block's cache key.
+    references = repr(sorted(env.get("references", {}).items()))
+    references = hashlib.sha256(references.encode("utf-8")).hexdigest()
+    lines = markdown_text.splitlines(keepends=True)
+    parts: list[str] = []
+    for start, end in _top_level_blocks(tokens):
+        source_map = tokens[start].map
+        if source_map is None:
+            parts.append(_render_tokens(parser, tokens[start:end], env))
+            continue
+        source = "".join(lines[source_map[0]:source_map[1]])
+        key_source = f"{settings.markdown_sanitizer}\0{references}\0{source}"
+        key = hashlib.sha256(key_source.encode("utf-8")).hexdigest()
+        with _block_cache_lock:
+            cached = _block_cache.get(key)
+        if cached is None:
+            cached = _render_tokens(parser, tokens[start:end], env)
+            with _block_cache_lock:
+                _block_cache.set(key, cached)
+        parts.append(cached)
+    return "".join(parts)
+
+
+_executor: Executor | None = None
+_executor_lock = threading.Lock()
+_process_pool_restarts = 0
+
+
+def _create_executor() -> Executor:
+    workers = settings.markdown_executor_workers
+    if settings.markdown_executor == "process":
+        if _process_pool_restarts <= MAX_PROCESS_POOL_RESTARTS:
+            try:
+                return ProcessPoolExecutor(max_workers=workers)
+            except (NotImplementedError, OSError):
+                logger.warning("markdown.process_pool_unavailable", exc_info=True)
+        else:
+            logger.error("markdown.process_pool_disabled", restarts=_process_pool_restarts)
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="markdown")
+
+
+def _get_executor() -> Executor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = _create_executor()
+        return _executor
+
+
+def _replace_broken_executor(broken: Executor) -> Executor:
+    # Every render in flight on a broken pool fails at once; only the first to get here shuts it
+    # down and swaps in a fresh process pool, the rest retry on that one. A pool that keeps
+    # breaking is replaced by threads for the rest of the process.
+    global _executor, _process_pool_restarts
+    with _executor_lock:
+        if _executor is broken or _executor is None:
+            broken.shutdown(wait=False, cancel_futures=True)
+            _process_pool_restarts += 1
+            _executor = _create_executor()
+        return _executor
+
+
+async def render_markdown(markdown_text: str) -> str:
+    # Short documents render faster inline than the round-trip to a worker costs.
+    if len(markdown_text) < settings.markdown_offload_threshold_chars:
+        return markdown_to_html(markdown_text)
+
+    loop = asyncio.get_running_loop()
+    executor = _get_executor()
+    while True:
+        try:
+            return await loop.run_in_executor(executor, markdown_to_html, markdown_text)
+        except BrokenProcessPool:
+            logger.warning("markdown.process_pool_broken", restarts=_process_pool_restarts)
+            executor = _replace_broken_executor(executor)
+
+
+def shutdown_markdown_executor() -> None:
+    global _executor, _process_pool_restarts
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+        _process_pool_restarts = 0
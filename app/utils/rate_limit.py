@@ -1,11 +1,217 @@
 from __future__ import annotations
 
+import math
+import time
 from datetime import UTC, datetime, timedelta
+from typing import NamedTuple
 
 from fastapi import HTTPException, status
 
+from app.core.config import settings
+from app.utils.lru import TTLCache
 from app.utils.redis import get_redis
 
+# GCRA over every key at once: each key stores its theoretical arrival time (TAT) in ms. A request
+# is admitted only if every key admits it, and only then are the TATs advanced, so a request
+# rejected by one rule never consumes quota from the others. ARGV[1] is the share of the remaining
+# quota to lease to the caller on top of an admitted request; the lease is charged here, up front,
+# so quota spent locally is never missing from Redis. ARGV[2] is an unused earlier lease handed
+# back, never refunded past an idle key. ARGV[3..] holds (limit, period_ms) pairs in key order.
+# Returns {allowed, limit, remaining, retry_after_ms, reset_ms, lease} for the tightest key.
+_GCRA_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+local share = tonumber(ARGV[1])
+local refund = tonumber(ARGV[2])
+local allowed = 1
+local retry_after = 0
+local tightest = nil
+local tats = {}
+local new_tats = {}
+local intervals = {}
+for i, key in ipairs(KEYS) do
+    local limit = tonumber(ARGV[i * 2 + 1])
+    local period = tonumber(ARGV[i * 2 + 2])
+    local interval = period / limit
+    local tat = tonumber(redis.call('GET', key)) or now
+    tat = math.max(tat - refund * interval, now)
+    local new_tat = tat + interval
+    local allow_at = new_tat - period
+    local remaining
+    if allow_at > now then
+        allowed = 0
+        retry_after = math.max(retry_after, allow_at - now)
+        remaining = 0
+    else
+        remaining = math.floor((period - (new_tat - now)) / interval)
+    end
+    tats[i] = tat
+    new_tats[i] = new_tat
+    intervals[i] = interval
+    if tightest == nil or remaining < tightest[2] then
+        tightest = {limit, remaining, i}
+    end
+end
+local lease = 0
+if allowed == 1 then
+    lease = math.floor(tightest[2] * share)
+end
+for i, key in ipairs(KEYS) do
+    local tat = tats[i]
+    if allowed == 1 then
+        tat = new_tats[i] + lease * intervals[i]
+    end
+    if allowed == 1 or refund > 0 then
+        redis.call('SET', key, tostring(tat), 'PX', math.max(1, math.ceil(tat - now)))
+    end
+    new_tats[i] = tat
+end
+local reset = math.ceil(math.max(new_tats[tightest[3]] - now, 0))
+return {allowed, tightest[1], tightest[2], math.ceil(retry_after), reset, lease}
+"""
+
+
+class RateLimitRule(NamedTuple):
+    key: str
+    limit: int
+    window_seconds: int
+
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after_ms: int
+    reset_ms: int
+
+    def headers(self) -> dict[str, str]:
+        headers = {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(self.remaining),
+            "X-RateLimit-Reset": str(math.ceil(self.reset_ms / 1000)),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(max(1, math.ceil(self.retry_after_ms / 1000)))
+        return headers
+
+
+def _rate_limit_key(key: str) -> str:
+    return f"ratelimit:{key}"
+
+
+class LocalLimiterStats:
+    def __init__(self) -> None:
+        self.redis_calls = 0
+        self.local_admits = 0
+        self.local_rejects = 0
+
+    def reset(self) -> None:
+        self.redis_calls = self.local_admits = self.local_rejects = 0
+
+
+class _LocalBucket:
+    __slots__ = ("tokens", "spent", "synced_at", "blocked_until", "result")
+
+    def __init__(
+            self, tokens: int, synced_at: float, blocked_until: float, result: RateLimitResult
+    ) -> None:
+        self.tokens = tokens
+        self.spent = 0
+        self.synced_at = synced_at
+        self.blocked_until = blocked_until
+        self.result = result
+
+
+_local_stats = LocalLimiterStats()
+_local_buckets: TTLCache[tuple[str, ...], _LocalBucket] = TTLCache(maxsize=50000, ttl_seconds=60)
+
+
+def local_limiter_stats() -> LocalLimiterStats:
+    return _local_stats
+
+
+def reset_local_limiter() -> None:
+    _local_buckets.clear()
+    _local_stats.reset()
+
+
+async def _check_remote(
+        rules: tuple[RateLimitRule, ...], share: float = 0.0, refund: int = 0
+) -> tuple[RateLimitResult, int]:
+    _local_stats.redis_calls += 1
+    redis = await get_redis()
+    script = redis.register_script(_GCRA_SCRIPT)
+    args: list[float] = [share, refund]
+    for rule in rules:
+        args.extend((rule.limit, rule.window_seconds * 1000))
+    allowed, limit, remaining, retry_after_ms, reset_ms, lease = await script(
+        keys=[_rate_limit_key(rule.key) for rule in rules], args=args
+    )
+    result = RateLimitResult(bool(allowed), int(limit), int(remaining), int(retry_after_ms), int(reset_ms))
+    return result, int(lease)
+
+
+def _local_share(rules: tuple[RateLimitRule, ...]) -> float:
+    prefixes = settings.rate_limits.local_prefixes
+    if not prefixes:
+        return 0.0
+    shares = []
+    for rule in rules:
+        matches = [prefix for prefix in prefixes if rule.key.startswith(prefix)]
+        if not matches:
+            return 0.0
+        shares.append(prefixes[max(matches, key=len)])
+    return min(shares)
+
+
+async def check_rate_limits(*rules: RateLimitRule) -> RateLimitResult:
+    share = _local_share(rules)
+    if share <= 0:
+        result, _ = await _check_remote(rules)
+        return result
+
+    # Each worker leases a share of the quota Redis reported as remaining and spends it locally
+    # until the lease runs out or goes stale. The lease is charged in Redis when it is granted and
+    # the unspent part is handed back on the next sync, so a bucket that expires in between can
+    # only leave quota unused, never admit past the limit. A rejection is remembered until its
+    # Retry-After passes.
+    key = tuple(rule.key for rule in rules)
+    now = time.monotonic()
+    bucket = _local_buckets.get(key)
+    if bucket is not None:
+        if now < bucket.blocked_until:
+            _local_stats.local_rejects += 1
+            retry_after_ms = math.ceil((bucket.blocked_until - now) * 1000)
+            return bucket.result._replace(retry_after_ms=retry_after_ms)
+        if bucket.tokens > 0 and now - bucket.synced_at < settings.rate_limits.local_sync_seconds:
+            bucket.tokens -= 1
+            bucket.spent += 1
+            _local_stats.local_admits += 1
+            return bucket.result._replace(remaining=max(0, bucket.result.remaining - bucket.spent))
+
+    refund = bucket.tokens if bucket is not None else 0
+    result, lease = await _check_remote(rules, share=share, refund=refund)
+    now = time.monotonic()
+    if result.allowed:
+        bucket = _LocalBucket(lease, now, 0.0, result)
+        _local_buckets.set(key, bucket, ttl_seconds=result.reset_ms / 1000 + 1)
+    else:
+        bucket = _LocalBucket(0, now, now + result.retry_after_ms / 1000, result)
+        _local_buckets.set(key, bucket, ttl_seconds=result.retry_after_ms / 1000)
+    return result
+
+
+async def enforce_rate_limits(
+        *rules: RateLimitRule,
+        error_detail: str = "Too many requests",
+) -> RateLimitResult:
+    result = await check_rate_limits(*rules)
+    if not result.allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=error_detail, headers=result.headers()
+        )
+    return result
+
 
 async def enforce_rate_limit(
         *,
@@ -13,14 +219,8 @@ async def enforce_rate_limit(
         limit: int,
         window_seconds: int,
         error_detail: str = "Too many requests",
-) -> None:
-    redis = await get_redis()
-    tx = redis.pipeline()
-    tx.incr(key, 1)
-    tx.expire(key, window_seconds)
-    current, _ = await tx.execute()
-    if current > limit:
-        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=error_detail)
+) -> RateLimitResult:
+    return await enforce_rate_limits(RateLimitRule(key, limit, window_seconds), error_detail=error_detail)
 
 
 def rate_limit_window(seconds: int) -> datetime:
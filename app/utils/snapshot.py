@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import asyncio
+import secrets
+from collections.abc import Awaitable, Callable
+
+import structlog
+
+from app.utils.redis import get_redis
+
+logger = structlog.get_logger(__name__)
+
+SnapshotBuilder = Callable[[], Awaitable[bytes]]
+
+LOCK_TTL_SECONDS = 30
+WAIT_POLL_SECONDS = 0.05
+
+_refresh_tasks: set[asyncio.Task[None]] = set()
+
+
+def _data_key(key: str) -> str:
+    return f"snapshot:{key}"
+
+
+def _fresh_key(key: str) -> str:
+    return f"snapshot:{key}:fresh"
+
+
+def _lock_key(key: str) -> str:
+    return f"snapshot:{key}:lock"
+
+
+# Lock values are per-holder tokens, so a holder whose lock expired can neither release nor store
+# over the lock of the worker that took it over.
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+_STORE_SCRIPT = """
+if redis.call('GET', KEYS[3]) ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+redis.call('SET', KEYS[2], '1', 'EX', ARGV[4])
+redis.call('DEL', KEYS[3])
+return 1
+"""
+
+
+async def _store(
+        key: str, token: str, payload: bytes, fresh_seconds: int, stale_seconds: int
+) -> None:
+    redis = await get_redis()
+    await redis.register_script(_STORE_SCRIPT)(
+        keys=[_data_key(key), _fresh_key(key), _lock_key(key)],
+        args=[token, payload, stale_seconds, fresh_seconds],
+    )
+
+
+async def _try_lock(key: str) -> str | None:
+    redis = await get_redis()
+    token = secrets.token_hex(16)
+    if await redis.set(_lock_key(key), token, nx=True, ex=LOCK_TTL_SECONDS):
+        return token
+    return None
+
+
+async def _release(key: str, token: str) -> None:
+    redis = await get_redis()
+    await redis.register_script(_RELEASE_SCRIPT)(keys=[_lock_key(key)], args=[token])
+
+
+async def _build_locked(
+        key: str, token: str, build: SnapshotBuilder, fresh_seconds: int, stale_seconds: int
+) -> bytes:
+    try:
+        payload = await build()
+    except BaseException:
+        await _release(key, token)
+        raise
+    await _store(key, token, payload, fresh_seconds, stale_seconds)
+    return payload
+
+
+async def _refresh(
+        key: str, token: str, build: SnapshotBuilder, fresh_seconds: int, stale_seconds: int
+) -> None:
+    try:
+        await _build_locked(key, token, build, fresh_seconds, stale_seconds)
+    except Exception:  # noqa: BLE001
+        logger.exception("snapshot.refresh_failed", key=key)
+
+
+async def get_snapshot(
+        key: str,
+        build: SnapshotBuilder,
+        *,
+        fresh_seconds: int,
+        stale_seconds: int,
+) -> bytes | str:
+    # Stale payloads are served immediately while whichever worker wins the lock rebuilds them in
+    # the background. On a cold miss only the lock holder builds; the other workers wait for its
+    # result, and one of them takes the lock over if the holder fails or its lock expires, so a
+    # key is never rebuilt by two workers at once.
+    redis = await get_redis()
+    payload, fresh = await redis.mget(_data_key(key), _fresh_key(key))
+    if payload is not None:
+        if fresh is None and (token := await _try_lock(key)) is not None:
+            task = asyncio.create_task(_refresh(key, token, build, fresh_seconds, stale_seconds))
+            _refresh_tasks.add(task)
+            task.add_done_callback(_refresh_tasks.discard)
+        return payload
+
+    while True:
+        token = await _try_lock(key)
+        if token is not None:
+            return await _build_locked(key, token, build, fresh_seconds, stale_seconds)
+        while True:
+            await asyncio.sleep(WAIT_POLL_SECONDS)
+            payload, locked = await redis.mget(_data_key(key), _lock_key(key))
+            if payload is not None:
+                return payload
+            if locked is None:
+                break
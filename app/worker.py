@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from celery import Celery
+
+from app.core.config import settings
+
+celery_app = Celery(
+    "stiky",
+    broker=settings.celery_broker_url or settings.redis.url,
+    include=["app.tasks.email"],
+)
+celery_app.conf.update(
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    task_ignore_result=True,
+    worker_prefetch_multiplier=1,
+    broker_connection_retry_on_startup=True,
+)
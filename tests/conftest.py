@@ -15,10 +15,13 @@ os.environ.setdefault("APP_CLOUDINARY__CLOUD_NAME", "demo")
 os.environ.setdefault("APP_CLOUDINARY__API_KEY", "demo-key")
 os.environ.setdefault("APP_CLOUDINARY__API_SECRET", "demo-secret")
 os.environ.setdefault("APP_CLOUDINARY__UPLOAD_FOLDER", "stiky/uploads")
+os.environ.setdefault("APP_BACKGROUND_TASKS_ENABLED", "false")
 
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 
+from app.db.models import Base
 from app.main import create_app
 
 
@@ -27,3 +30,31 @@ def client() -> TestClient:
     app = create_app()
     with TestClient(app) as test_client:
         yield test_client
+
+
+@pytest.fixture
+async def fake_redis(monkeypatch: pytest.MonkeyPatch):
+    from fakeredis import FakeAsyncRedis
+
+    from app.utils import redis as redis_utils
+
+    fake = FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr(redis_utils, "_redis_pool", fake)
+    yield fake
+    await fake.flushall()
+
+
+@pytest.fixture
+async def pg_sessions():
+    # Tests that need real Postgres semantics (CTEs, row locks, concurrency) run against the
+    # database named by STIKY_TEST_DATABASE_URL, e.g. the docker-compose.test.yml service.
+    # The schema is dropped and recreated for every test.
+    url = os.environ.get("STIKY_TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("set STIKY_TEST_DATABASE_URL to a disposable Postgres database")
+    engine = create_async_engine(url, pool_size=20, max_overflow=40)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
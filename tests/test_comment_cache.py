@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.services import comment_cache
+
+
+async def test_pages_are_served_from_cache_until_invalidated(fake_redis) -> None:
+    builds = 0
+
+    async def build() -> comment_cache.Page:
+        nonlocal builds
+        builds += 1
+        return comment_cache.Page(b'{"items": []}')
+
+    field = comment_cache.page_field("tree", None, 20, 3, 2)
+    assert await comment_cache.get_page(1, field, build) == b'{"items": []}'
+    assert await comment_cache.get_page(1, field, build) == b'{"items": []}'
+    assert builds == 1
+
+    await comment_cache.invalidate(1)
+    await comment_cache.get_page(1, field, build)
+    assert builds == 2
+
+
+async def test_page_built_before_invalidation_is_not_stored(fake_redis) -> None:
+    async def stale_build() -> comment_cache.Page:
+        await comment_cache.invalidate(7)
+        return comment_cache.Page(b"stale")
+
+    async def fresh_build() -> comment_cache.Page:
+        return comment_cache.Page(b"fresh")
+
+    field = comment_cache.page_field("flat")
+    assert await comment_cache.get_page(7, field, stale_build) == b"stale"
+    assert await comment_cache.get_page(7, field, fresh_build) == b"fresh"
+
+
+async def test_only_server_issued_cursors_are_cached(fake_redis) -> None:
+    builds: list[str | None] = []
+
+    def builder(cursor: str | None, issued: tuple[str, ...] = ()):
+        async def build() -> comment_cache.Page:
+            builds.append(cursor)
+            return comment_cache.Page(b"[]", issued)
+
+        return build
+
+    async def get(cursor: str | None, issued: tuple[str, ...] = ()) -> None:
+        field = comment_cache.page_field("tree", cursor)
+        await comment_cache.get_page(3, field, builder(cursor, issued), cursor=cursor)
+
+    await get("forged")
+    await get("forged")
+    await get(None, ("next",))
+    await get("next")
+    await get("next")
+    assert builds == ["forged", "forged", None, "next"]
+
+
+async def test_each_page_expires_on_its_own_ttl(
+        fake_redis, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "comment_cache_ttl_seconds", 1)
+    builds: list[str] = []
+
+    def builder(field: str):
+        async def build() -> comment_cache.Page:
+            builds.append(field)
+            return comment_cache.Page(field.encode())
+
+        return build
+
+    await comment_cache.get_page(5, "old", builder("old"))
+    # New variants keep being stored without pushing back the old page's expiry.
+    for n in range(3):
+        await asyncio.sleep(0.4)
+        await comment_cache.get_page(5, f"new-{n}", builder(f"new-{n}"))
+    await comment_cache.get_page(5, "old", builder("old"))
+    assert builds == ["old", "new-0", "new-1", "new-2", "old"]
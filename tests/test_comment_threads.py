@@ -0,0 +1,58 @@
+from datetime import UTC, datetime, timedelta
+
+from app.db.models.comment import Comment
+from app.db.models.user import User
+from app.services.comments import link_comment_threads
+from app.utils.cursor import decode_comment_cursor
+
+AUTHOR = User(id="u-1", email="a@example.com", onboarding_completed=True)
+START = datetime(2024, 5, 1, tzinfo=UTC)
+
+
+def _comment(comment_id: int, parent_id: int | None = None, depth: int = 0) -> Comment:
+    created_at = START + timedelta(minutes=comment_id)
+    return Comment(
+        id=comment_id,
+        post_id=1,
+        user_id=AUTHOR.id,
+        parent_id=parent_id,
+        content=f"comment {comment_id}",
+        is_deleted=False,
+        depth=depth,
+        created_at=created_at,
+        updated_at=created_at,
+        author=AUTHOR,
+    )
+
+
+def test_nested_replies_are_linked_under_their_parents() -> None:
+    loaded = [_comment(1), _comment(2), _comment(3, 1, 1), _comment(4, 3, 2), _comment(5, 1, 1)]
+    roots = link_comment_threads(loaded, {1: 2, 3: 1})
+
+    assert [root.id for root in roots] == [1, 2]
+    assert [reply.id for reply in roots[0].replies] == [3, 5]
+    assert [reply.id for reply in roots[0].replies[0].replies] == [4]
+    assert not any(node.has_more_replies for node in (roots[0], roots[1], roots[0].replies[0]))
+    assert roots[0].replies_cursor is None
+
+
+def test_truncated_replies_hand_a_cursor_to_the_replies_endpoint() -> None:
+    loaded = [_comment(1), _comment(2, 1, 1), _comment(3, 1, 1)]
+    (root,) = link_comment_threads(loaded, {1: 5})
+
+    assert root.reply_count == 5
+    assert root.has_more_replies
+    assert decode_comment_cursor(root.replies_cursor) == (root.replies[-1].created_at, 3)
+
+
+def test_unloaded_levels_report_more_replies_without_a_cursor() -> None:
+    # reply_limit=0, or a node at the last loaded depth: replies exist but none were loaded.
+    loaded = [_comment(1), _comment(2, 1, 1)]
+    (root,) = link_comment_threads(loaded, {1: 1, 2: 4})
+    (leaf,) = root.replies
+
+    assert not root.has_more_replies
+    assert leaf.reply_count == 4
+    assert leaf.has_more_replies
+    assert leaf.replies_cursor is None
+    assert leaf.replies == []
@@ -0,0 +1,112 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.db.models.blog import Blog
+from app.db.models.enums import PostCategory
+from app.db.models.like import PostLike
+from app.db.models.post import Post
+from app.db.models.user import User
+from app.services.counters import flush_counter, reconcile_counter
+from app.services.likes import toggle_like
+
+
+async def test_like_during_reconcile_is_counted_once(
+        pg_sessions, fake_redis, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "post_counter_store", "redis")
+    sessions = pg_sessions
+
+    async with sessions() as session:
+        users = [User(email=f"{uuid4().hex}@example.com") for _ in range(3)]
+        session.add_all(users)
+        await session.flush()
+        blog = Blog(user_id=users[0].id, name="Drift", slug="drift")
+        session.add(blog)
+        await session.flush()
+        post = Post(
+            blog_id=blog.id,
+            title="Drift",
+            slug="drift",
+            category=PostCategory.dev,
+            content_md="",
+            content_html="",
+        )
+        session.add(post)
+        await session.commit()
+
+    async def toggle(user: User) -> None:
+        async with sessions() as session:
+            await toggle_like(session, post, user)
+
+    await toggle(users[0])
+    await toggle(users[1])
+
+    # A like that starts after the reconcile has read the pending deltas must wait for the batch
+    # to commit instead of landing in the source rows without its delta.
+    late: list[asyncio.Task[None]] = []
+    hmget = fake_redis.hmget
+
+    async def hmget_then_like(*args, **kwargs):
+        snapshot = await hmget(*args, **kwargs)
+        late.append(asyncio.create_task(toggle(users[2])))
+        await asyncio.sleep(0.5)
+        return snapshot
+
+    monkeypatch.setattr(fake_redis, "hmget", hmget_then_like)
+    async with sessions() as session:
+        await reconcile_counter(session, "like_count")
+    await asyncio.gather(*late)
+
+    async with sessions() as session:
+        await flush_counter(session, "like_count")
+        like_count = await session.scalar(select(Post.like_count).where(Post.id == post.id))
+        rows = await session.scalar(
+            select(func.count()).select_from(PostLike).where(PostLike.post_id == post.id)
+        )
+    assert like_count == rows == 3
+
+
+async def test_flush_retried_after_lost_cleanup_is_applied_once(
+        pg_sessions, fake_redis, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "post_counter_store", "redis")
+    sessions = pg_sessions
+
+    async with sessions() as session:
+        user = User(email=f"{uuid4().hex}@example.com")
+        session.add(user)
+        await session.flush()
+        blog = Blog(user_id=user.id, name="Flush", slug="flush")
+        session.add(blog)
+        await session.flush()
+        post = Post(
+            blog_id=blog.id,
+            title="Flush",
+            slug="flush",
+            category=PostCategory.dev,
+            content_md="",
+            content_html="",
+        )
+        session.add(post)
+        await session.commit()
+        await toggle_like(session, post, user)
+
+    # The deltas commit, then the process dies before the flushing hash is cleared.
+    delete = fake_redis.delete
+
+    async def fail_once(*keys):
+        monkeypatch.setattr(fake_redis, "delete", delete)
+        raise ConnectionError("redis went away")
+
+    monkeypatch.setattr(fake_redis, "delete", fail_once)
+    async with sessions() as session:
+        with pytest.raises(ConnectionError):
+            await flush_counter(session, "like_count")
+    async with sessions() as session:
+        await flush_counter(session, "like_count")
+        like_count = await session.scalar(select(Post.like_count).where(Post.id == post.id))
+    assert like_count == 1
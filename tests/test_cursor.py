@@ -0,0 +1,35 @@
+from datetime import UTC, datetime
+
+import pytest
+
+from app.utils.cursor import (
+    decode_comment_cursor,
+    decode_post_cursor,
+    encode_comment_cursor,
+    encode_post_cursor,
+)
+
+
+def test_post_cursor_round_trip() -> None:
+    published_at = datetime(2024, 3, 1, 12, 30, tzinfo=UTC)
+    created_at = datetime(2024, 2, 28, 9, 0, tzinfo=UTC)
+    cursor = encode_post_cursor(published_at, created_at, 42)
+    assert decode_post_cursor(cursor) == (published_at, created_at, 42)
+
+
+def test_post_cursor_without_published_at() -> None:
+    created_at = datetime(2024, 2, 28, 9, 0, tzinfo=UTC)
+    cursor = encode_post_cursor(None, created_at, 7)
+    assert decode_post_cursor(cursor) == (None, created_at, 7)
+
+
+def test_invalid_post_cursor() -> None:
+    with pytest.raises(ValueError):
+        decode_post_cursor("not-a-cursor")
+
+
+def test_comment_cursor_round_trip() -> None:
+    created_at = datetime(2024, 2, 28, 9, 0, tzinfo=UTC)
+    assert decode_comment_cursor(encode_comment_cursor(created_at, 5)) == (created_at, 5)
+    with pytest.raises(ValueError):
+        decode_comment_cursor(encode_post_cursor(None, created_at, 7))
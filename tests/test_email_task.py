@@ -0,0 +1,53 @@
+import httpx
+import pytest
+from celery.exceptions import Retry
+
+from app.services import auth
+from app.services.email import resend_client
+from app.tasks.email import send_otp_email_task
+
+
+def _status_error(status_code: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "https://api.resend.com/emails")
+    response = httpx.Response(status_code, request=request)
+    return httpx.HTTPStatusError("error", request=request, response=response)
+
+
+def _patch_send(monkeypatch: pytest.MonkeyPatch, exc: Exception) -> list[dict]:
+    calls: list[dict] = []
+
+    def send(**kwargs) -> None:
+        calls.append(kwargs)
+        raise exc
+
+    monkeypatch.setattr(resend_client, "send_otp_email_sync", send)
+    return calls
+
+
+def test_server_errors_are_retried(monkeypatch: pytest.MonkeyPatch) -> None:
+    _patch_send(monkeypatch, _status_error(503))
+    with pytest.raises(Retry):
+        send_otp_email_task.apply(
+            kwargs={"email": "a@example.com", "code": "123456", "expires_in_minutes": 5}, throw=True
+        )
+
+
+def test_client_errors_are_not_retried(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls = _patch_send(monkeypatch, _status_error(422))
+    result = send_otp_email_task.apply(
+        kwargs={"email": "a@example.com", "code": "123456", "expires_in_minutes": 5}, throw=True
+    )
+    assert result.successful()
+    assert len(calls) == 1
+
+
+async def test_enqueue_failure_falls_back_to_inline_send(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: list[dict] = []
+
+    def publish(**kwargs) -> None:
+        calls.append(kwargs)
+        raise ConnectionError("broker down")
+
+    monkeypatch.setattr(send_otp_email_task, "apply_async", publish)
+    assert await auth._enqueue_otp_email("a@example.com", "123456") is False
+    assert calls[0]["retry"] is False
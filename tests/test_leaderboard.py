@@ -0,0 +1,23 @@
+from datetime import UTC, datetime, timedelta
+
+from app.services import leaderboard
+
+
+async def test_recent_likes_outrank_older_likes(fake_redis) -> None:
+    now = datetime.now(UTC)
+    for _ in range(3):
+        await leaderboard.record_like(1, True, now - timedelta(days=3))
+    for _ in range(2):
+        await leaderboard.record_like(2, True, now)
+
+    assert await leaderboard.top_post_ids(1, 10) == [2, 1]
+    assert await leaderboard.top_post_ids(30, 10) == [1, 2]
+
+
+async def test_unlike_removes_original_contribution(fake_redis) -> None:
+    liked_at = datetime.now(UTC) - timedelta(hours=6)
+    await leaderboard.record_like(1, True, liked_at)
+    await leaderboard.record_like(2, True)
+    await leaderboard.record_like(1, False, liked_at)
+
+    assert await leaderboard.top_post_ids(7, 10) == [2]
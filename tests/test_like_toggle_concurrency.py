@@ -0,0 +1,62 @@
+import asyncio
+import random
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.db.models.blog import Blog
+from app.db.models.enums import PostCategory
+from app.db.models.like import PostLike, PostLikeDaily
+from app.db.models.post import Post
+from app.db.models.user import User
+from app.services.counters import flush_counter
+from app.services.likes import toggle_like
+
+
+@pytest.mark.parametrize("counter_store", ["postgres", "redis"])
+async def test_parallel_toggles_keep_counter_equal_to_rows(
+        pg_sessions, fake_redis, monkeypatch: pytest.MonkeyPatch, counter_store: str
+) -> None:
+    monkeypatch.setattr(settings, "post_counter_store", counter_store)
+    sessions = pg_sessions
+
+    async with sessions() as session:
+        users = [User(email=f"{uuid4().hex}@example.com") for _ in range(20)]
+        owner = users[0]
+        session.add_all(users)
+        await session.flush()
+        blog = Blog(user_id=owner.id, name="Race", slug="race")
+        session.add(blog)
+        await session.flush()
+        post = Post(
+            blog_id=blog.id,
+            title="Race",
+            slug="race",
+            category=PostCategory.dev,
+            content_md="",
+            content_html="",
+        )
+        session.add(post)
+        await session.commit()
+
+    async def toggle(user: User) -> None:
+        async with sessions() as session:
+            await toggle_like(session, post, user)
+
+    # Many toggles per user so same-row delete/insert races happen alongside cross-user updates.
+    toggles = [random.choice(users) for _ in range(400)]
+    await asyncio.gather(*(toggle(user) for user in toggles))
+
+    async with sessions() as session:
+        await flush_counter(session, "like_count")
+        like_count = await session.scalar(select(Post.like_count).where(Post.id == post.id))
+        rows = await session.scalar(
+            select(func.count()).select_from(PostLike).where(PostLike.post_id == post.id)
+        )
+        rollup = await session.scalar(
+            select(func.coalesce(func.sum(PostLikeDaily.likes), 0))
+            .where(PostLikeDaily.post_id == post.id)
+        )
+    assert like_count == rows == rollup
@@ -0,0 +1,67 @@
+import asyncio
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from app.core.config import settings
+from app.utils import markdown
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+async def test_offloaded_render_matches_inline(executor: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "markdown_executor", executor)
+    monkeypatch.setattr(settings, "markdown_offload_threshold_chars", 10)
+    source = "# Title\n\nSome *text* with <script>alert(1)</script>\n"
+    try:
+        assert await markdown.render_markdown(source) == markdown.markdown_to_html(source)
+    finally:
+        markdown.shutdown_markdown_executor()
+
+
+def test_token_stream_sanitizer_escapes_raw_html_and_unsafe_links(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "markdown_sanitizer", "tokens")
+    html = markdown.markdown_to_html(
+        '<script>alert(1)</script>\n\n[x](javascript:alert(1)) [y](https://example.com "t")\n\n'
+        "```js\ncode\n```\n"
+    )
+    assert "<script>" not in html
+    assert 'href="javascript' not in html
+    assert '<a href="https://example.com" title="t">y</a>' in html
+    assert "<pre><code>code\n</code></pre>" in html
+
+
+class _BrokenPool(Executor):
+    def __init__(self) -> None:
+        self.shutdowns = 0
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        future: Future = Future()
+        future.set_exception(BrokenProcessPool("worker died"))
+        return future
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        self.shutdowns += 1
+
+
+async def test_broken_process_pool_is_replaced_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "markdown_executor", "process")
+    monkeypatch.setattr(settings, "markdown_offload_threshold_chars", 10)
+    source = "# Title\n\nSome *text*\n"
+    broken = _BrokenPool()
+    markdown.shutdown_markdown_executor()
+    markdown._executor = broken
+    try:
+        rendered = await asyncio.gather(*(markdown.render_markdown(source) for _ in range(5)))
+        assert rendered == [markdown.markdown_to_html(source)] * 5
+        assert broken.shutdowns == 1
+        assert isinstance(markdown._executor, ProcessPoolExecutor)
+
+        # A pool that keeps breaking gives way to threads.
+        monkeypatch.setattr(markdown, "_process_pool_restarts", markdown.MAX_PROCESS_POOL_RESTARTS)
+        markdown._executor.shutdown()
+        markdown._executor = broken = _BrokenPool()
+        assert await markdown.render_markdown(source) == markdown.markdown_to_html(source)
+        assert isinstance(markdown._executor, ThreadPoolExecutor)
+    finally:
+        markdown.shutdown_markdown_executor()
@@ -0,0 +1,56 @@
+import pytest
+
+from app.utils import markdown
+
+CORPUS = [
+    "",
+    "plain paragraph",
+    "# Heading\n\nParagraph with *emphasis*, **strong** and `code`.\n",
+    "Setext heading\n==============\n\nText \"quoted\" -- with typographer... (c)\n",
+    "- one\n- two\n\n  continued item\n- three\n\n1. first\n2. second\n",
+    "> quote line\n> more\n>\n> - nested list\n\nafter quote\n",
+    "```python\ndef f():\n\n    return 1\n```\n\n    indented code\n\n---\n",
+    "See [the docs][docs] and [inline](https://example.com \"title\").\n\n[docs]: https://example.com/docs\n",
+    "![alt text](https://example.com/a.png)\n\n<https://autolink.example>\n",
+    "text with <b>inline html</b> and <script>alert(1)</script>\n\nnext\n",
+    "<div>\n\n*inside raw block*\n\n</div>\n\n<blockquote>\n\nquoted\n\n</blockquote>\n",
+    "line one  \nhard break\\\nanother\n\n\n\n\nfar paragraph\n",
+    "* a\n\n    * nested\n\n* b\n\nTerm\n",
+    "[a]: /x\n[b]: /y\n\n[a] [b] [c]\n",
+    "a <b>x\n\ny</b> z\n",
+    "a <em>open\n\nnext para\n",
+    "* a <i>x\n\npara</i>\n",
+    "see <a href=\"https://example.com\">link\n\nstill linked</a> done\n",
+    "a <table>\n\nb\n",
+]
+
+
+def _full_render(source: str) -> str:
+    return markdown._sanitize(markdown.md.render(source))
+
+
+@pytest.mark.parametrize("source", CORPUS)
+def test_block_render_matches_full_render(source: str) -> None:
+    markdown._block_cache.clear()
+    assert markdown.markdown_to_html(source) == _full_render(source)
+    assert markdown.markdown_to_html(source) == _full_render(source)
+
+
+def test_edits_reuse_blocks_and_stay_correct() -> None:
+    markdown._block_cache.clear()
+    document = "\n\n".join(f"## Section {n}\n\nBody paragraph {n} with *markup*." for n in range(20))
+    markdown.markdown_to_html(document)
+    hits_before = markdown._block_cache.hits
+
+    edited = document.replace("Body paragraph 7", "Edited paragraph 7")
+    assert markdown.markdown_to_html(edited) == _full_render(edited)
+    assert markdown._block_cache.hits - hits_before == 39
+
+
+def test_reference_definition_changes_rerender_dependent_blocks() -> None:
+    markdown._block_cache.clear()
+    before = "Read [the guide][g].\n\n[g]: https://example.com/old\n"
+    after = "Read [the guide][g].\n\n[g]: https://example.com/new\n"
+    assert markdown.markdown_to_html(before) == _full_render(before)
+    assert markdown.markdown_to_html(after) == _full_render(after)
+    assert "example.com/new" in markdown.markdown_to_html(after)
@@ -0,0 +1,26 @@
+import pytest
+
+from app.core.config import settings
+from app.services.otp_store import OtpCheck, check_code, store_code
+
+
+async def test_matching_code_is_consumed_once(fake_redis) -> None:
+    await store_code("a@example.com", "hash-1")
+    assert 0 < await fake_redis.ttl("otp:code:a@example.com") <= settings.otp_ttl_minutes * 60
+    assert await check_code("a@example.com", "hash-1") is OtpCheck.valid
+    assert await check_code("a@example.com", "hash-1") is OtpCheck.missing
+
+
+async def test_new_code_replaces_previous_one(fake_redis) -> None:
+    await store_code("a@example.com", "hash-1")
+    await store_code("a@example.com", "hash-2")
+    assert await check_code("a@example.com", "hash-1") is OtpCheck.invalid
+    assert await check_code("a@example.com", "hash-2") is OtpCheck.valid
+
+
+async def test_code_is_dropped_after_retry_limit(fake_redis, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "otp_retry_limit", 2)
+    await store_code("a@example.com", "hash-1")
+    assert await check_code("a@example.com", "wrong") is OtpCheck.invalid
+    assert await check_code("a@example.com", "wrong") is OtpCheck.exhausted
+    assert await check_code("a@example.com", "hash-1") is OtpCheck.missing
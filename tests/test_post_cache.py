@@ -0,0 +1,51 @@
+from datetime import UTC, datetime
+
+import orjson
+
+from app.db.models.enums import PostCategory, PostStatus
+from app.schemas.post import PostDetail, PostTagInfo
+from app.services import post_cache
+
+
+def _detail() -> PostDetail:
+    now = datetime(2024, 5, 1, tzinfo=UTC)
+    return PostDetail(
+        id=3,
+        title="Hello",
+        slug="hello",
+        category=PostCategory.dev,
+        status=PostStatus.published,
+        like_count=4,
+        comment_count=2,
+        view_count=10,
+        published_at=now,
+        created_at=now,
+        updated_at=now,
+        content_md="# Hello",
+        content_html="<h1>Hello</h1>",
+        tags=[PostTagInfo(id=1, name="Python", slug="python")],
+    )
+
+
+def test_composed_body_matches_full_serialization() -> None:
+    detail = _detail()
+    static_body = detail.model_dump_json(exclude=set(post_cache.VOLATILE_FIELDS))
+    body = post_cache.compose_body(static_body, like_count=4, comment_count=2, view_count=10)
+    assert orjson.loads(body) == orjson.loads(detail.model_dump_json())
+
+
+def test_etag_tracks_counters_and_honours_if_none_match() -> None:
+    etag = post_cache.compute_etag("abc", like_count=1, comment_count=0, view_count=5)
+    assert etag != post_cache.compute_etag("abc", like_count=2, comment_count=0, view_count=5)
+    assert post_cache.etag_matches(f'"other", W/{etag}', etag)
+    assert not post_cache.etag_matches(None, etag)
+
+
+def test_liked_by_me_is_merged_per_viewer() -> None:
+    detail = _detail().model_copy(update={"liked_by_me": True})
+    static_body = detail.model_dump_json(exclude=set(post_cache.VOLATILE_FIELDS))
+    body = post_cache.compose_body(static_body, like_count=4, comment_count=2, view_count=10, liked_by_me=True)
+    assert orjson.loads(body) == orjson.loads(detail.model_dump_json())
+    counters = {"like_count": 4, "comment_count": 2, "view_count": 10}
+    etags = {post_cache.compute_etag("abc", **counters, liked_by_me=liked) for liked in (None, True, False)}
+    assert len(etags) == 3
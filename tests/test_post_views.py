@@ -0,0 +1,20 @@
+import pytest
+
+from app.core.config import settings
+from app.services.auth import count_unique_post_viewers, record_post_view
+
+
+async def test_record_post_view_deduplicates_with_single_key(fake_redis) -> None:
+    assert await record_post_view(1, "viewer-a", ttl_seconds=60)
+    assert not await record_post_view(1, "viewer-a", ttl_seconds=60)
+    assert 0 < await fake_redis.ttl("views:1:viewer-a") <= 60
+    assert await count_unique_post_viewers(1, 24) is None
+
+
+async def test_record_post_view_hyperloglog_mode(fake_redis, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "post_view_tracking", "hll")
+    assert await record_post_view(2, "viewer-a")
+    assert not await record_post_view(2, "viewer-a")
+    assert await record_post_view(2, "viewer-b")
+    assert await count_unique_post_viewers(2, 24) == 2
+    assert await fake_redis.keys("views:2:*") == []
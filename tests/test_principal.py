@@ -0,0 +1,25 @@
+from starlette.requests import Request
+
+from app.api.deps import get_principal_optional
+from app.core.security import create_refresh_token
+from app.services.auth import issue_access_token
+
+
+def _request(authorization: str | None = None) -> Request:
+    headers = [(b"authorization", authorization.encode())] if authorization else []
+    return Request({"type": "http", "headers": headers})
+
+
+async def test_principal_is_read_from_access_token_claims() -> None:
+    token = issue_access_token("user-1", True)
+    principal = await get_principal_optional(_request(f"Bearer {token}"), None)
+    assert principal is not None
+    assert principal.id == "user-1"
+    assert principal.onboarding_completed
+
+
+async def test_principal_is_none_for_anonymous_or_refresh_tokens() -> None:
+    assert await get_principal_optional(_request(), None) is None
+    assert await get_principal_optional(_request(), "garbage") is None
+    refresh_token = create_refresh_token("user-1", "token-id")
+    assert await get_principal_optional(_request(), refresh_token) is None
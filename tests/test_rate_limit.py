@@ -0,0 +1,70 @@
+import pytest
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.utils.rate_limit import (
+    RateLimitRule,
+    check_rate_limits,
+    enforce_rate_limits,
+    local_limiter_stats,
+    reset_local_limiter,
+)
+
+
+async def test_burst_up_to_limit_then_reject(fake_redis) -> None:
+    rule = RateLimitRule("test:burst", 3, 60)
+    results = [await check_rate_limits(rule) for _ in range(4)]
+    assert [result.allowed for result in results] == [True, True, True, False]
+    assert [result.remaining for result in results[:3]] == [2, 1, 0]
+    assert 0 < results[3].retry_after_ms <= 20_000
+    assert results[3].headers()["Retry-After"] == "20"
+
+
+async def test_rejected_request_does_not_consume_other_keys(fake_redis) -> None:
+    tight = RateLimitRule("test:tight", 1, 60)
+    loose = RateLimitRule("test:loose", 2, 60)
+    assert (await check_rate_limits(tight, loose)).allowed
+    assert not (await check_rate_limits(tight, loose)).allowed
+    result = await check_rate_limits(loose)
+    assert result.allowed
+    assert result.remaining == 0
+
+
+async def test_enforce_raises_with_headers(fake_redis) -> None:
+    rule = RateLimitRule("test:enforce", 1, 10)
+    await enforce_rate_limits(rule)
+    with pytest.raises(HTTPException) as exc_info:
+        await enforce_rate_limits(rule)
+    assert exc_info.value.status_code == 429
+    assert exc_info.value.headers["X-RateLimit-Remaining"] == "0"
+    assert "Retry-After" in exc_info.value.headers
+
+
+async def test_local_prelimiter_spends_leases_and_caches_rejections(
+        fake_redis, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings.rate_limits, "local_prefixes", {"flood:": 0.5})
+    reset_local_limiter()
+    rule = RateLimitRule("flood:client", 10, 60)
+    results = [await check_rate_limits(rule) for _ in range(100)]
+    assert sum(result.allowed for result in results) == 10
+    stats = local_limiter_stats()
+    assert stats.redis_calls == 5
+    assert stats.local_admits == 6
+    assert stats.local_rejects == 89
+    assert all(result.retry_after_ms > 0 for result in results[10:])
+    reset_local_limiter()
+
+
+async def test_local_leases_lost_to_expiry_never_exceed_the_limit(
+        fake_redis, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings.rate_limits, "local_prefixes", {"paced:": 0.5})
+    reset_local_limiter()
+    rule = RateLimitRule("paced:client", 60, 60)
+    admitted = 0
+    for _ in range(4):
+        admitted += sum([(await check_rate_limits(rule)).allowed for _ in range(30)])
+        # The local bucket expires between bursts, taking any unsynced state with it.
+        reset_local_limiter()
+    assert admitted <= 60
@@ -0,0 +1,87 @@
+import asyncio
+from datetime import timedelta
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select, update
+
+from app.core.config import settings
+from app.core.security import hash_token
+from app.db.models.token import RefreshToken
+from app.db.models.user import User
+from app.services.auth import _issue_tokens, rotate_refresh_token
+
+
+async def _user_with_token(sessions) -> tuple[User, str]:
+    async with sessions() as session:
+        user = User(email=f"{uuid4().hex}@example.com")
+        session.add(user)
+        await session.commit()
+        _, refresh_token, _ = await _issue_tokens(session, user)
+        await session.commit()
+    return user, refresh_token
+
+
+async def _tokens(sessions, user: User) -> list[RefreshToken]:
+    async with sessions() as session:
+        stmt = (
+            select(RefreshToken)
+            .where(RefreshToken.user_id == user.id)
+            .order_by(RefreshToken.created_at)
+        )
+        return list((await session.scalars(stmt)).all())
+
+
+async def test_rotation_revokes_the_presented_token_and_links_its_successor(pg_sessions) -> None:
+    user, refresh_token = await _user_with_token(pg_sessions)
+    async with pg_sessions() as session:
+        rotated_user, _, new_refresh = await rotate_refresh_token(
+            session, hash_token(refresh_token), user.id
+        )
+    assert rotated_user.id == user.id
+
+    old, new = await _tokens(pg_sessions, user)
+    assert old.revoked and old.revoked_at is not None
+    assert not new.revoked
+    assert new.rotated_from_id == old.id
+    assert new.token_hash == hash_token(new_refresh)
+
+
+async def test_concurrent_rotations_of_one_token_issue_one_successor(pg_sessions) -> None:
+    user, refresh_token = await _user_with_token(pg_sessions)
+
+    async def rotate() -> bool:
+        async with pg_sessions() as session:
+            try:
+                await rotate_refresh_token(session, hash_token(refresh_token), user.id)
+            except HTTPException:
+                return False
+            return True
+
+    assert sum(await asyncio.gather(*(rotate() for _ in range(10)))) == 1
+    tokens = await _tokens(pg_sessions, user)
+    assert len(tokens) == 2
+    # Losing the race inside the grace window is not treated as reuse.
+    assert not tokens[1].revoked
+
+
+async def test_replay_after_grace_window_revokes_the_chain(
+        pg_sessions, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings.jwt, "refresh_reuse_grace_seconds", 5)
+    user, refresh_token = await _user_with_token(pg_sessions)
+    async with pg_sessions() as session:
+        _, _, second = await rotate_refresh_token(session, hash_token(refresh_token), user.id)
+    async with pg_sessions() as session:
+        await rotate_refresh_token(session, hash_token(second), user.id)
+        await session.execute(
+            update(RefreshToken).values(revoked_at=RefreshToken.revoked_at - timedelta(seconds=60))
+        )
+        await session.commit()
+
+    async with pg_sessions() as session:
+        with pytest.raises(HTTPException) as exc_info:
+            await rotate_refresh_token(session, hash_token(refresh_token), user.id)
+    assert exc_info.value.status_code == 401
+    assert all(token.revoked for token in await _tokens(pg_sessions, user))
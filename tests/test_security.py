@@ -0,0 +1,25 @@
+import jwt
+import pytest
+
+from app.core.security import create_access_token, decode_token, verified_token_cache_stats
+
+
+def test_decode_token_reuses_verified_claims() -> None:
+    token = create_access_token("user-1", extra={"typ": "access"})
+    before = verified_token_cache_stats()
+
+    first = decode_token(token)
+    first["sub"] = "tampered"
+    second = decode_token(token)
+
+    after = verified_token_cache_stats()
+    assert second["sub"] == "user-1"
+    assert after["hits"] == before["hits"] + 1
+    assert after["misses"] == before["misses"] + 1
+
+
+def test_decode_token_rejects_modified_signature() -> None:
+    token = create_access_token("user-1")
+    decode_token(token)
+    with pytest.raises(jwt.InvalidTokenError):
+        decode_token(token[:-2] + ("AA" if not token.endswith("AA") else "BB"))
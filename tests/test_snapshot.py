@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+from app.utils.snapshot import get_snapshot
+
+
+async def _get(build) -> str:
+    payload = await get_snapshot("demo", build, fresh_seconds=60, stale_seconds=600)
+    return payload.decode() if isinstance(payload, bytes) else payload
+
+
+async def test_snapshot_serves_stale_payload_while_rebuilding_once(fake_redis) -> None:
+    builds: list[int] = []
+
+    async def build() -> bytes:
+        builds.append(len(builds))
+        await asyncio.sleep(0.01)
+        return f"[{len(builds)}]".encode()
+
+    assert await _get(build) == "[1]"
+    assert await _get(build) == "[1]"
+    assert len(builds) == 1
+
+    await fake_redis.delete("snapshot:demo:fresh")
+    stale = await asyncio.gather(*(_get(build) for _ in range(5)))
+    assert stale == ["[1]"] * 5
+    await asyncio.sleep(0.05)
+    assert len(builds) == 2
+    assert await _get(build) == "[2]"
+
+
+async def test_cold_miss_builds_once_for_concurrent_callers(fake_redis) -> None:
+    builds: list[int] = []
+
+    async def build() -> bytes:
+        builds.append(len(builds))
+        await asyncio.sleep(0.1)
+        return b"[1]"
+
+    assert await asyncio.gather(*(_get(build) for _ in range(5))) == ["[1]"] * 5
+    assert len(builds) == 1
+
+
+async def test_failed_build_after_lock_expiry_keeps_the_new_holders_lock(fake_redis) -> None:
+    async def failing_build() -> bytes:
+        # The lock expires mid-build and another worker takes it over.
+        await fake_redis.set("snapshot:demo:lock", "other-worker")
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        await _get(failing_build)
+    assert await fake_redis.get("snapshot:demo:lock") == "other-worker"
@@ -0,0 +1,18 @@
+import httpx
+
+from app.main import create_app
+from app.utils.snapshot import get_snapshot
+
+
+async def test_anonymous_trending_response_varies_on_credentials(fake_redis) -> None:
+    async def build() -> bytes:
+        return b"[]"
+
+    await get_snapshot("trending:posts:30:10", build, fresh_seconds=60, stale_seconds=600)
+    transport = httpx.ASGITransport(app=create_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/api/v1/trending/posts")
+
+    assert response.status_code == 200
+    assert response.json() == []
+    assert response.headers["vary"] == "Authorization, Cookie"
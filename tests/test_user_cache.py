@@ -0,0 +1,42 @@
+from datetime import UTC, datetime
+
+import orjson
+from sqlalchemy import inspect
+
+from app.db.base import SessionLocal
+from app.services import user_cache
+
+USER_ID = "8f0e3b8c-1d7f-4c36-9d53-0d5f0c1d2a11"
+
+
+async def test_cached_user_is_attached_without_a_query(fake_redis) -> None:
+    created_at = datetime(2024, 1, 1, tzinfo=UTC)
+    await fake_redis.set(
+        f"cache:users:{USER_ID}",
+        orjson.dumps(
+            {
+                "id": USER_ID,
+                "email": "reader@example.com",
+                "nickname": "reader",
+                "profile_image_url": None,
+                "onboarding_completed": True,
+                "created_at": created_at,
+                "updated_at": created_at,
+            }
+        ),
+    )
+
+    async with SessionLocal() as session:
+        user = await user_cache.get_user(session, USER_ID)
+        assert user is not None
+        assert inspect(user).persistent
+        assert user.created_at == created_at
+        assert not session.dirty
+
+    await fake_redis.flushall()
+    async with SessionLocal() as session:
+        user = await user_cache.get_user(session, USER_ID)
+        assert user is not None and user.nickname == "reader"
+
+    await user_cache.invalidate_user(USER_ID)
+    assert user_cache._local_users.get(USER_ID) is None